@@ -14,50 +14,53 @@ pip install langchain-google-genai
 """
 
 # 2. CREATE FOLDER STRUCTURE AND FILES AS BEFORE
-import json
-from PIL import Image
+import time
+_import_start = time.perf_counter()
 import streamlit as st
-import pandas as pd
-import base64, random
-import time, datetime
-from pypdf import PdfReader
-import io, os
-from src.helper import download_hugging_face_embeddings
-from src.prompt import *
-from streamlit_tags import st_tags
-import plotly.express as px
-from yt_dlp import YoutubeDL
+import base64
+import os
+from src.resources import warm_up, startup_report, record_startup
+from src.cache import get_cache, sha256_bytes
+from src.analysis import (
+    EMPTY_RESUME, EXTRACTION_MODE, missing_required_fields, extract_resume_data_from_text, recommend_skills,
+    recommend_courses, RoleSearch, analysis_cache_key, generate_todo_list_for_role,
+    stream_todo_list_for_role, todo_cache_key, prefetch_todo_lists, pending_todo_prefetch
+)
+from src.concurrency import stream_fan_out, CALL_TIMEOUT
+from src.ingest import ingest_pdf
+from src.metrics import get_registry
+from src.service_client import ServiceClient
+from src.upload_store import get_upload_store
+from src.templates import PAGE_CSS, overview_html, skill_chips_html, recommended_skills_html, course_cards_html, role_card_html
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_pinecone import PineconeVectorStore
-from langchain.chains import create_retrieval_chain
-from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_core.prompts import ChatPromptTemplate
+# Heavy optional imports are deferred: yt_dlp loads on the first fetch_yt_video
+# call, and the page never used plotly, PIL, streamlit_tags or the langchain chains
+
+# Streamlit re-executes this script on every rerun; only the cold first import is recorded
+record_startup("app_imports", time.perf_counter() - _import_start)
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Gemini model
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",
-    temperature=0.7,
-    google_api_key=os.getenv("GEMINI_API_KEY")
-)
+# With ANALYSIS_SERVICE_URL set, this app is a thin client of the analysis
+# service (server.py) and runs no models itself
+ANALYSIS_SERVICE_URL = os.getenv("ANALYSIS_SERVICE_URL", "")
+service_client = ServiceClient(ANALYSIS_SERVICE_URL) if ANALYSIS_SERVICE_URL else None
 
-# === Set Pinecone & Gemini API keys ===
-os.environ["PINECONE_API_KEY"] = os.environ.get('PINECONE_API_KEY')
-GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
+# === Shared Gemini model, embeddings and Pinecone store ===
+# Built once per process (see src/resources.py) and warmed up in the background
+# so reruns and new sessions don't pay the model load again.
+if service_client is None:
+    warm_up()
 
-# === Initialize Pinecone for Company Roles ===
-embeddings = download_hugging_face_embeddings()
-index_name = "domain-decoders"
-docsearch = PineconeVectorStore.from_existing_index(
-    index_name=index_name,
-    embedding=embeddings
-)
-retriever = docsearch.as_retriever(search_type="similarity", search_kwargs={"k": 3})
+# Stream an opened to-do list token by token instead of showing it only once complete
+STREAM_TODO_LISTS = os.getenv("STREAM_TODO_LISTS", "1") == "1"
+# Shows the startup report and the in-process metrics registry (stage latencies, tokens, cache hits) in the sidebar
+DEBUG_PANEL = os.getenv("DEBUG_PANEL", "0") == "1"
 
 def fetch_yt_video(link):
+    from yt_dlp import YoutubeDL
+
     with YoutubeDL({'quiet': True}) as ydl:
         info = ydl.extract_info(link, download=False)
         return info.get('title', 'Unknown Title')
@@ -68,391 +71,59 @@ def get_table_download_link(df, filename, text):
     href = f'<a href="data:file/csv;base64,{b64}" download="{filename}">{text}</a>'
     return href
 
-def extract_resume_data(pdf_path):
-    try:
-        # Read PDF text
-        reader = PdfReader(pdf_path)
-        text = "\n".join([page.extract_text() or "" for page in reader.pages])
-
-        # Create structured prompt
-        prompt = f"""
-        Analyze this resume and extract information in STRICT JSON FORMAT:
-        {{
-            "name": "Full name",
-            "email": "Email address",
-            "phone": "Phone number",
-            "skills": ["list", "of", "technical", "skills"],
-            "experience_level": "Fresher/Intermediate/Experienced",
-            "education": ["Education entries"],
-            "projects": ["Project descriptions"]
-        }}
-
-        Rules:
-        1. Phone format: +XX-XXXXXXXXXX
-        2. Skills must be technical terms
-        3. Experience level based on work duration
-        4. Return empty values if not found
-
-        Resume Content:
-        {text[:10000]}
-        """
-
-        # Get Gemini response
-        response = llm.invoke(prompt)
-        
-        # Clean and parse JSON
-        json_str = response.content.strip()
-        json_str = json_str.replace('```json', '').replace('```', '')
-        data = json.loads(json_str)
-
-        # Validate required fields
-        required_fields = ["name", "email", "skills"]
-        for field in required_fields:
-            if field not in data or not data[field]:
-                st.error(f"Missing required field: {field}")
-                data[field] = "" if field != "skills" else []
-
-        return data
-
-    except Exception as e:
-        st.error(f"Resume parsing failed: {str(e)}")
-        return {
-            "name": "",
-            "email": "",
-            "phone": "",
-            "skills": [],
-            "experience_level": "Fresher",
-            "education": [],
-            "projects": []
-        }
-    
-def skill_recommender(current_skills):
-    try:
-        prompt = f"""
-        Recommend 18 most important technical skills to add to these existing skills: {', '.join(current_skills)}.
-        Focus on in-demand skills for software development roles.
-        Return only a comma-separated list, no other text.
-        """
-        response = llm.invoke(prompt)
-        return [skill.strip() for skill in response.content.split(",")]
-    except Exception as e:
-        st.error(f"Recommendation error: {str(e)}")
-        return []
-
-def course_recommender(skills):
-    try:
-        prompt = f"""
-        Recommend 8 relevant online courses for someone with these skills: {', '.join(skills)}.
-        Respond in this EXACT format for each course:
-        "Course Title | Description (15 words) | URL | Category (Programming/Data Science/Web Dev/Design/Business)"
-        
-        Example:
-        "Python Crash Course | Learn Python fundamentals through hands-on projects | https://example.com | Programming"
-        
-        Return only the 8 course entries line by line, no additional text.
-        """
-        response = llm.invoke(prompt)
-        
-        # Process response
-        courses = []
-        for line in response.content.split("\n"):
-            if "|" in line:
-                parts = [p.strip() for p in line.split("|")]
-                if len(parts) == 4:
-                    # Always use a static placeholder image with the category as text
-                    thumbnail = f"https://placehold.co/400x240?text={parts[3].replace(' ', '+')}"
-                    courses.append({
-                        "title": parts[0],
-                        "description": parts[1],
-                        "url": parts[2],
-                        "category": parts[3],
-                        "thumbnail": thumbnail
-                    })
-        return courses[:5]
-        
-    except Exception as e:
-        st.error(f"Course recommendation error: {str(e)}")
-        return []
-
 def insert_data(*args, **kwargs):
     pass
 
 st.set_page_config(page_title="AI Resume Analyzer", page_icon='📄', layout="wide")
 
 def inject_custom_css():
-    st.markdown("""
-    <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@400;600;700&display=swap" rel="stylesheet">
-    <style>
-        html, body, .main {
-            height: 100%;
-            min-height: 100vh;
-            font-family: 'Poppins', sans-serif !important;
-            background: linear-gradient(135deg, #f8cdda 0%, #1fa2ff 100%, #a1c4fd 100%);
-            background-attachment: fixed;
-        }
-        .main {
-            background: none !important;
-            padding: 1rem;
-        }
-        h1, h2, h3, h4, h5, h6 {
-            font-family: 'Poppins', sans-serif !important;
-            font-weight: 700;
-            letter-spacing: 0.5px;
-        }
-        h1 {
-            font-size: clamp(1.8rem, 4vw, 2.8rem);
-            color: #22223b;
-            margin-bottom: 1.5rem;
-        }
-        h2 {
-            font-size: clamp(1.6rem, 3vw, 2.2rem);
-            color: #22223b;
-        }
-        h3 {
-            font-size: clamp(1.4rem, 2.5vw, 1.6rem);
-            color: #22223b;
-        }
-        .card {
-            border-radius: 24px;
-            padding: clamp(1.5rem, 3vw, 2.5rem) clamp(1rem, 2vw, 2rem);
-            background: rgba(255, 255, 255, 0.25);
-            box-shadow: 0 8px 32px 0 rgba(31, 38, 135, 0.18);
-            backdrop-filter: blur(12px);
-            -webkit-backdrop-filter: blur(12px);
-            border: 1.5px solid rgba(255, 255, 255, 0.35);
-            margin: clamp(1rem, 2vw, 2rem) 0;
-            transition: box-shadow 0.3s, transform 0.3s;
-            width: 100%;
-            max-width: 1200px;
-            margin-left: auto;
-            margin-right: auto;
-        }
-        .card:hover {
-            box-shadow: 0 12px 40px 0 rgba(31, 38, 135, 0.25);
-            transform: translateY(-4px) scale(1.01);
-        }
-        .skill-chip {
-            display: inline-block;
-            background: rgba(255,255,255,0.45);
-            padding: clamp(0.8rem, 1.5vw, 1.4rem) clamp(1.4rem, 2.8vw, 2.8rem);
-            border-radius: 30px;
-            margin: 0.5rem;
-            color: #22223b;
-            font-weight: 600;
-            font-size: clamp(0.9rem, 1.5vw, 1.1rem);
-            box-shadow: 0 2px 8px rgba(31, 38, 135, 0.08);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        .course-card {
-            background: rgba(255,255,255,0.30);
-            border-radius: 20px;
-            padding: clamp(1rem, 2vw, 2rem) clamp(0.8rem, 1.5vw, 1.5rem);
-            margin: clamp(1rem, 2vw, 2rem) 0;
-            box-shadow: 0 6px 24px 0 rgba(31, 38, 135, 0.13);
-            transition: box-shadow 0.3s, transform 0.3s;
-            display: flex;
-            flex-direction: column;
-            gap: 1rem;
-            align-items: flex-start;
-            border: 1.5px solid rgba(255,255,255,0.25);
-            backdrop-filter: blur(10px);
-            width: 100%;
-        }
-        @media (min-width: 768px) {
-            .course-card {
-                flex-direction: row;
-                align-items: center;
-            }
-        }
-        .course-card:hover {
-            box-shadow: 0 12px 40px 0 rgba(31, 38, 135, 0.22);
-            transform: translateY(-4px) scale(1.01);
-        }
-        .edu-proj-item {
-            display: flex;
-            align-items: flex-start;
-            background: rgba(255,255,255,0.35);
-            border-radius: 16px;
-            margin: 1.2rem 0;
-            padding: 1.2rem 1.5rem;
-            box-shadow: 0 4px 18px 0 rgba(31, 38, 135, 0.10);
-            border-left: 8px solid;
-            border-image: linear-gradient(135deg, #f8cdda 0%, #1fa2ff 100%, #a1c4fd 100%) 1;
-            transition: box-shadow 0.3s, transform 0.3s;
-            width: 100%;
-        }
-        .edu-proj-title {
-            font-size: clamp(1rem, 1.5vw, 1.22rem);
-            font-weight: 700;
-            color: #22223b;
-            margin-bottom: 0.3rem;
-            letter-spacing: 0.2px;
-        }
-        .edu-proj-detail {
-            font-size: clamp(0.9rem, 1.2vw, 1.08rem);
-            color: #4a6fa5;
-            font-weight: 500;
-            margin-left: 0.1rem;
-        }
-        .personal-info h4 {
-            font-size: clamp(1.2rem, 1.8vw, 1.5rem);
-            margin: 1.2rem 0;
-            color: #22223b;
-        }
-        .personal-info p {
-            color: #4a6fa5;
-            margin: 0.5rem 0;
-            font-size: clamp(0.9rem, 1.2vw, 1.1rem);
-        }
-        .details-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 1.5rem;
-            margin: 1.5rem 0;
-            width: 100%;
-        }
-        .details-section {
-            text-align: center;
-            padding: 1rem;
-        }
-        .education-list, .project-list {
-            text-align: left;
-            margin: 0 auto;
-            width: 100%;
-        }
-        .stButton>button {
-            background: linear-gradient(90deg, #a1c4fd 0%, #c2e9fb 100%);
-            color: #22223b;
-            border-radius: 10px;
-            padding: clamp(0.8rem, 1.5vw, 1rem) clamp(1.4rem, 2.8vw, 2.8rem);
-            font-weight: 600;
-            font-size: clamp(0.9rem, 1.2vw, 1.1rem);
-            border: none;
-            box-shadow: 0 2px 8px rgba(31, 38, 135, 0.08);
-            transition: background 0.3s, color 0.3s, box-shadow 0.3s;
-            width: 100%;
-            max-width: 300px;
-            margin: 0 auto;
-        }
-        .stButton>button:hover {
-            background: linear-gradient(90deg, #f8cdda 0%, #a1c4fd 100%);
-            color: #22223b;
-            box-shadow: 0 4px 16px rgba(31, 38, 135, 0.13);
-        }
-        .sidebar .sidebar-content {
-            background: rgba(255,255,255,0.10);
-        }
-        /* Custom scrollbar */
-        ::-webkit-scrollbar {
-            width: 10px;
-            background: rgba(161,196,253,0.15);
-        }
-        ::-webkit-scrollbar-thumb {
-            background: rgba(31,38,135,0.13);
-            border-radius: 8px;
-        }
-        /* Responsive images */
-        img {
-            max-width: 100%;
-            height: auto;
-        }
-        /* Responsive columns */
-        @media (max-width: 768px) {
-            .stColumns {
-                flex-direction: column;
-            }
-            .stColumn {
-                width: 100% !important;
-                margin: 1rem 0;
-            }
-        }
-        /* File uploader styling */
-        .stFileUploader {
-            width: 100%;
-            max-width: 600px;
-            margin: 0 auto;
-        }
-        /* Container padding */
-        .stContainer {
-            padding: 1rem;
-        }
-        /* Responsive text */
-        p, span, div {
-            font-size: clamp(0.9rem, 1.2vw, 1.1rem);
-        }
-    </style>
-    """, unsafe_allow_html=True)
-
-def get_company_role_recommendations(skills, top_k=5):
-    """
-    Given a list of user skills, retrieve the most relevant company roles from Pinecone.
-    """
-    try:
-        # Prepare the query string from user skills
-        query = ", ".join(skills)
-        if not query.strip():
-            st.warning("No skills provided for company role recommendations.")
-            return []
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
 
-        # Retrieve relevant documents from Pinecone
-        docs = retriever.get_relevant_documents(query)
-        if not docs:
-            st.warning("No relevant company roles found in the database.")
-            return []
-
-        # Parse and format the results
-        roles = []
-        for doc in docs[:top_k]:
-            # Each doc.page_content is a string with company role info
-            # Example format: "Company: ...\nRole: ...\nResponsibilities: ...\n..."
-            lines = doc.page_content.split('\n')
-            role_info = {}
-            for line in lines:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    role_info[key.strip()] = value.strip()
-            # Only add if essential fields are present
-            if "Company" in role_info and "Role" in role_info:
-                roles.append({
-                    "company": role_info.get("Company", ""),
-                    "role": role_info.get("Role", ""),
-                    "responsibilities": role_info.get("Responsibilities", ""),
-                    "language": role_info.get("Language", ""),
-                    "knowledge": role_info.get("Essential Knowledge", ""),
-                    "experience": role_info.get("Experience Required", ""),
-                    "level": role_info.get("Level of Role", ""),
-                    "package": role_info.get("Package Details", ""),
-                })
-        return roles
-    except Exception as e:
-        st.error(f"Error getting company role recommendations: {str(e)}")
-        return []
-
-def generate_todo_list_for_role(user_skills, role):
+def show_todo_list(cache, user_skills, role):
     """
-    Use Gemini LLM to generate a personalized to-do list for the user to attain the given role.
-    """
-    prompt = f"""
-    The user has these skills: {', '.join(user_skills)}.
-    The target company role is:
-    Company: {role['company']}
-    Role: {role['role']}
-    Responsibilities: {role['responsibilities']}
-    Language: {role['language']}
-    Essential Knowledge: {role['knowledge']}
-    Experience Required: {role['experience']}
-    Level: {role['level']}
-    Package: {role['package']}
-    
-    Please provide a step-by-step, actionable to-do list (5-7 items) for the user to become a strong candidate for this role. 
-    Focus on skills to learn, certifications, projects, networking, and other career moves. 
-    Format as a numbered list.
+    Render a role's to-do list, generating it only now that the user asked for it.
+    Results are memoized per (skill set, role) for every session; a background
+    prefetch already working on this role is awaited instead of starting a new call.
     """
-    try:
-        response = llm.invoke(prompt)
-        return response.content.strip()
-    except Exception as e:
-        return f"Could not generate to-do list: {str(e)}"
+    if service_client is not None:
+        try:
+            with st.spinner("Generating to-do list..."):
+                st.markdown(service_client.todo(user_skills, role))
+        except Exception as e:
+            st.error(f"Could not generate to-do list: {str(e)}")
+        return
+
+    key = todo_cache_key(user_skills, role)
+    todo = cache.get(key)
+    if todo is None:
+        prefetch = pending_todo_prefetch(user_skills, role)
+        if prefetch is not None:
+            with st.spinner("Generating to-do list..."):
+                try:
+                    prefetch.result(timeout=CALL_TIMEOUT)
+                except Exception:
+                    pass
+            todo = cache.get(key)
+    if todo is None:
+        slot = st.empty()
+        try:
+            if STREAM_TODO_LISTS:
+                text = ""
+                for chunk in stream_todo_list_for_role(user_skills, role):
+                    text += chunk
+                    slot.markdown(text)
+                todo = text.strip()
+            else:
+                with st.spinner("Generating to-do list..."):
+                    todo = generate_todo_list_for_role(user_skills, role)
+        except Exception as e:
+            slot.error(f"Could not generate to-do list: {str(e)}")
+            return
+        if todo:
+            cache.set(key, todo)
+        slot.markdown(todo)
+        return
+    st.markdown(todo)
 
 def run():
     inject_custom_css()
@@ -479,6 +150,11 @@ def run():
             </a>
         </div><
         """, unsafe_allow_html=True)
+        if DEBUG_PANEL:
+            with st.expander("Startup report"):
+                st.json(startup_report())
+            with st.expander("Metrics"):
+                st.json(get_registry().snapshot())
 
     if choice == "User Portal":
         with st.container():
@@ -486,103 +162,99 @@ def run():
     <h2 style="font-size:2.3rem; margin-bottom:2rem;">Upload Your Resume</h2>
     </div>""",unsafe_allow_html=True)
             pdf_file = st.file_uploader("", type=["pdf"], help="Upload your resume in PDF format")
+            # Time until the upload widget is first on screen, while models may still be warming up
+            record_startup("first_page", time.perf_counter() - _import_start)
             st.markdown('<center><div style="mix-width: 1200px; margin: 0 auto;justify-content: center;"></center>',unsafe_allow_html=True)
             st.markdown('</div>',unsafe_allow_html=True)
             
             if pdf_file:
-                save_path = f"./Uploaded_Resumes/{pdf_file.name}"
-                with open(save_path, "wb") as f:
-                    f.write(pdf_file.getbuffer())
-                
-                with st.spinner('Analyzing Resume...'):
-                    resume_data = extract_resume_data(save_path)
-                    page_count = len(PdfReader(save_path).pages)
-                    exp_level = resume_data.get('experience_level', 'Fresher')
+                # Results are cached on disk by PDF content hash + model + prompt version,
+                # so re-uploads and reruns don't call Gemini again
+                cache = get_cache()
+                pdf_bytes = pdf_file.getvalue()
+                pdf_hash = sha256_bytes(pdf_bytes)
+                def cache_key(stage):
+                    return analysis_cache_key(pdf_hash, stage)
+
+                if service_client is not None:
+                    # The service runs the analysis; this session only renders the result
+                    remote_analyses = st.session_state.setdefault("remote_analyses", {})
+                    if pdf_hash not in remote_analyses:
+                        with st.spinner('Analyzing Resume...'):
+                            try:
+                                remote_analyses[pdf_hash] = service_client.analyze(pdf_bytes, pdf_file.name)
+                            except Exception as e:
+                                st.error(f"Resume analysis failed: {str(e)}")
+                                return
+                    analysis = remote_analyses[pdf_hash]
+                    resume_data = analysis["resume"]
+                    for field in missing_required_fields(resume_data):
+                        st.error(f"Missing required field: {field}")
+                    for stage, error in analysis["errors"].items():
+                        st.error(f"Analysis step '{stage}' failed: {error}")
                     current_skills = resume_data.get('skills', [])
-                    recommended_skills = skill_recommender(current_skills)
-                    recommended_courses = course_recommender(current_skills)
-                    
-                    ts = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+                    recommended_roles = analysis["roles"]
+                else:
+                    # Parse the PDF once, from memory: text and page count together
+                    ingested = st.session_state.setdefault("ingested", {})
+                    if pdf_hash not in ingested:
+                        try:
+                            ingested[pdf_hash] = ingest_pdf(pdf_bytes)
+                        except Exception as e:
+                            st.error(f"Resume parsing failed: {str(e)}")
+                            return
+                    parsed = ingested[pdf_hash]
+
+                    # Keep a copy of each upload, stored by content hash; identical bytes are written once.
+                    # In thin-client mode the service keeps the copy instead.
+                    saved_uploads = st.session_state.setdefault("saved_uploads", set())
+                    if pdf_hash not in saved_uploads:
+                        get_upload_store().put(pdf_bytes, pdf_file.name, parsed.page_count, pdf_hash)
+                        saved_uploads.add(pdf_hash)
+                
+                    with st.spinner('Analyzing Resume...'):
+                        try:
+                            resume_data = cache.get_or_compute(
+                                cache_key(f"resume:{EXTRACTION_MODE}"), lambda: extract_resume_data_from_text(parsed.text),
+                                # Incomplete extractions are retried on the next upload instead of cached
+                                should_cache=lambda data: not missing_required_fields(data)
+                            )
+                            for field in missing_required_fields(resume_data):
+                                st.error(f"Missing required field: {field}")
+                        except Exception as e:
+                            st.error(f"Resume parsing failed: {str(e)}")
+                            resume_data = dict(EMPTY_RESUME)
+                        current_skills = resume_data.get('skills', [])
+
+                        # One retrieval serves both the target role and the role list; it is
+                        # kept in the session so expanding a to-do list doesn't search again
+                        session_roles = st.session_state.setdefault("recommended_roles", {})
+                        if pdf_hash in session_roles:
+                            recommended_roles = session_roles[pdf_hash]
+                        else:
+                            try:
+                                recommended_roles = RoleSearch(current_skills).roles()
+                                session_roles[pdf_hash] = recommended_roles
+                            except Exception as e:
+                                st.error(f"Error getting company role recommendations: {str(e)}")
+                                recommended_roles = []
+
+                        # Most users only open the top roles; start those in the background
+                        prefetch_todo_lists(cache, current_skills, recommended_roles)
                 
                 st.markdown("---")
                 # st.markdown("## Analysis Report")
 
-                # Prepare Education and Projects HTML
-                education_html = ""
-                if resume_data.get('education'):
-                    education_html = (
-                        '<div class="details-section" style="grid-column: 1 / -1; margin-bottom: 2.5rem;">'
-                        '<h4 style="color: #1e3d59; font-size: 1.25rem; font-weight: 600; margin-bottom: 1.2rem; text-align:left;">🎓 Education</h4>'
-                        '<div class="education-list">'
-                        + ''.join([
-                            f'<div style="background: #f8f9fa; border-radius: 12px; box-shadow: 0 2px 8px rgba(31,38,135,0.07); padding: 1.1rem 1.5rem; margin-bottom: 1.1rem; border-left: 5px solid #a1c4fd;">'
-                            f'<span style="font-size: 1.08rem; font-weight: 600; color: #22223b;">{edu.split("|", 1)[0]}</span>'
-                            f'<br><span style="font-size: 1.02rem; color: #4a6fa5; font-weight: 500;">{edu.split("|", 1)[1] if "|" in edu else ""}</span>'
-                            f'</div>'
-                            for edu in resume_data.get('education', ['No education details found'])
-                        ]) +
-                        '</div></div>'
-                    )
-                
-                projects_html = ""
-                if resume_data.get('projects'):
-                    projects_html = (
-                        '<div class="details-section" style="grid-column: 1 / -1; margin-bottom: 2.5rem;">'
-                        '<h4 style="color: #1e3d59; font-size: 1.25rem; font-weight: 600; margin-bottom: 1.2rem; text-align:left;">🔧 Key Projects</h4>'
-                        '<div class="project-list">'
-                        + ''.join([
-                            f'<div style="background: #f8f9fa; border-radius: 12px; box-shadow: 0 2px 8px rgba(31,38,135,0.07); padding: 1.1rem 1.5rem; margin-bottom: 1.1rem; border-left: 5px solid #f8cdda;">'
-                            f'<span style="font-size: 1.08rem; font-weight: 600; color: #22223b;">{project.split("|", 1)[0]}</span>'
-                            f'<br><span style="font-size: 1.02rem; color: #4a6fa5; font-weight: 500;">{project.split("|", 1)[1] if "|" in project else ""}</span>'
-                            f'</div>'
-                            for project in resume_data.get('projects', ['No project details found'])
-                        ]) +
-                        '</div></div>'
-                    )
-
                 # Centered Analysis Report Heading
                 st.markdown('<div style="text-align:center;"><h2 style="font-size:2.3rem; margin-bottom:2rem;">Analysis Report</h2></div>', unsafe_allow_html=True)
 
                 # Personal Overview and Details
-                st.markdown(f'''
-                <div class="card" style="max-width: 1200px; margin: 0 auto;">
-                    <h3 style="text-align:center;">Personal Overview</h3>
-                    <div class="personal-info">
-                        <h4 style="text-align:center;">{resume_data.get('name', 'Not found')}</h4>
-                        <div class="details-grid">
-                            <div class="details-section">
-                                <p>📧 Email</p>
-                                <h4>{resume_data.get('email', 'Not provided')}</h4>
-                            </div>
-                            <div class="details-section">
-                                <p>📱 Contact</p>
-                                <h4>{resume_data.get('phone', 'Not provided')}</h4>
-                            </div>
-                            <div class="details-section">
-                                <p>📅 Experience Level</p>
-                                <h4>{exp_level}</h4>
-                            </div>
-                            <div class="details-section">
-                                <p>💼 Target Job Role</p>
-                                <h4>{(get_company_role_recommendations(current_skills, top_k=1)[0]['role'] + ' at ' + get_company_role_recommendations(current_skills, top_k=1)[0]['company']) if get_company_role_recommendations(current_skills, top_k=1) else 'Not found'}</h4>
-                            </div>
-                            {education_html}
-                            {projects_html}
-                        </div>
-                    </div>
-                </div>
-                ''', unsafe_allow_html=True)
+                st.markdown(overview_html(resume_data, recommended_roles[0] if recommended_roles else None), unsafe_allow_html=True)
 
                 # Technical Skills
                 st.markdown('<div style="text-align:center;"><h3 style="font-size:2rem; margin-top:2.5rem;">Technical Competencies</h3></div>', unsafe_allow_html=True)
                 if resume_data.get('skills'):
-                    st.markdown(f'''
-                    <div class="card" style="max-width: 1200px; margin: 0 auto; padding: 1.5rem 2rem;">
-                        <div style="display: flex; flex-wrap: wrap; gap: 1rem; justify-content: center;">
-                            {''.join([f'<span class="skill-chip">{skill}</span>' for skill in resume_data['skills']])}
-                        </div>
-                    </div>
-                    ''', unsafe_allow_html=True)
+                    st.markdown(skill_chips_html(resume_data['skills']), unsafe_allow_html=True)
                 else:
                     st.warning("No technical skills detected")
 
@@ -594,83 +266,64 @@ def run():
                 cols = st.columns(2)
                 with cols[0]:
                     st.markdown('<div style="text-align:center;"><h4 style="font-size:1.5rem; margin-top:2rem;">Recommended Skills</h4></div>', unsafe_allow_html=True)
-                    rec_skills_html = '<div class="card" style="max-width: 95%; margin: 0 auto; display: flex; flex-wrap: wrap; gap: 1.5rem; justify-content: center;">'
-                    for skill in recommended_skills:
-                        rec_skills_html += f'''<div style="flex: 1 1 180px; min-width: 140px; background: #f8f9fa; border-radius: 10px; padding: 1rem 1.5rem; margin: 0.5rem 0; display: flex; align-items: center; gap: 1rem;">
-                            <div style="width: 8px; height: 40px; background: #1e3d59; border-radius: 4px;"></div>
-                            <span style="font-size: 1.1rem; color: #2a4b6e;">{skill}</span>
-                        </div>'''
-                    rec_skills_html += '</div>'
-                    st.markdown(rec_skills_html, unsafe_allow_html=True)
+                    skills_slot = st.empty()
+                    skills_slot.info("Finding skills to add...")
                 with cols[1]:
                     st.markdown('<div style="text-align:center;"><h4 style="font-size:1.5rem; margin-top:2rem;">Recommended Courses</h4></div>', unsafe_allow_html=True)
-                    for course in recommended_courses:
-                        st.markdown(f'''
-                        <div class="course-card" style="width: 100%; max-width: 95%; margin: 2rem auto; display: flex; align-items: center; background: white; box-shadow: 0 4px 20px rgba(30, 61, 89, 0.1); border-radius: 12px; padding: 1.5rem;">
-                            <img src="{course['thumbnail']}" 
-                                 style="width: 120px; height: 80px; border-radius: 8px; object-fit: cover; margin-right: 2rem;">
-                            <div style="flex: 1;">
-                                <a href="{course['url']}" target="_blank" 
-                                   style="font-size: 1.1rem; font-weight: 600; color: #1e3d59; text-decoration: none;">
-                                    {course['title']}
-                                </a>
-                                <p style="margin: 12px 0; color: #4a6fa5; font-size: 1rem; line-height: 1.4;">
-                                    {course['description']}
-                                </p>
-                                <div style="display: flex; gap: 1rem; align-items: center;">
-                                    <span style="background: #e8eef4; padding: 6px 16px; border-radius: 20px; 
-                                          font-size: 0.95rem; color: #1e3d59;">
-                                        {course['category']}
-                                    </span>
-                                    <a href="{course['url']}" target="_blank" 
-                                       style="color: #1e3d59; text-decoration: none; font-weight: 500;">
-                                        View Course →
-                                    </a>
-                                </div>
-                            </div>
-                        </div>
-                        ''', unsafe_allow_html=True)
+                    courses_slot = st.empty()
+                    courses_slot.info("Finding courses...")
 
                 # After the Recommended Courses section, add:
                 st.markdown('<div style="text-align:center;"><h3 style="font-size:2rem; margin-top:2.5rem;">Recommended Company Roles</h3></div>', unsafe_allow_html=True)
                 
-                # Get role recommendations
-                recommended_roles = get_company_role_recommendations(current_skills)
-                
-                # Display role recommendations with personalized to-do lists
+                # To-do lists are generated only when the user opens them. Their slots are
+                # filled after the skills and courses, which must not wait on a streamed list
+                opened_todos = []
                 if recommended_roles:
                     for role in recommended_roles:
-                        st.markdown(f'''
-                        <div class="course-card" style="width: 100%; max-width: 95%; margin: 2rem auto; display: flex; align-items: center; background: white; box-shadow: 0 4px 20px rgba(30, 61, 89, 0.1); border-radius: 12px; padding: 1.5rem;">
-                            <div style="flex: 1;">
-                                <h4 style="font-size: 1.3rem; font-weight: 600; color: #1e3d59; margin-bottom: 0.5rem;">
-                                    {role['role']} at {role['company']}
-                                </h4>
-                                <div style="display: flex; gap: 1rem; margin-bottom: 1rem;">
-                                    <span style="background: #e8eef4; padding: 6px 16px; border-radius: 20px; font-size: 0.95rem; color: #1e3d59;">
-                                        {role['level']}
-                                    </span>
-                                    <span style="background: #e8eef4; padding: 6px 16px; border-radius: 20px; font-size: 0.95rem; color: #1e3d59;">
-                                        {role['experience']}
-                                    </span>
-                                    <span style="background: #e8eef4; padding: 6px 16px; border-radius: 20px; font-size: 0.95rem; color: #1e3d59;">
-                                        {role['package']}
-                                    </span>
-                                </div>
-                                <p style="color: #4a6fa5; font-size: 1rem; line-height: 1.4;">
-                                    <b>Responsibilities:</b> {role['responsibilities']}<br>
-                                    <b>Language:</b> {role['language']}<br>
-                                    <b>Essential Knowledge:</b> {role['knowledge']}
-                                </p>
-                                <details>
-                                    <summary style="font-weight:600; color:#1e3d59; cursor:pointer;">Show Personalized To-Do List</summary>
-                                    <div style="margin-top:1rem; color:#22223b; background:#f8f9fa; border-radius:8px; padding:1rem;">
-                                        {generate_todo_list_for_role(current_skills, role)}
-                                    </div>
-                                </details>
-                            </div>
-                        </div>
-                        ''', unsafe_allow_html=True)
+                        st.markdown(role_card_html(role), unsafe_allow_html=True)
+                        if st.checkbox("Show Personalized To-Do List", key=f"todo:{pdf_hash}:{role['id']}"):
+                            opened_todos.append((st.container(), role))
                 else:
                     st.warning("No role recommendations available at the moment.")
+
+                if service_client is not None:
+                    skills_slot.markdown(recommended_skills_html(analysis["skills"]), unsafe_allow_html=True)
+                    courses_slot.markdown(course_cards_html(analysis["courses"]), unsafe_allow_html=True)
+                else:
+                    # Finished recommendations are kept in the session, so reruns (e.g. opening
+                    # a to-do list) render them straight away
+                    recommendations = st.session_state.setdefault("recommendations", {}).setdefault(pdf_hash, {})
+                    if "skills" in recommendations:
+                        skills_slot.markdown(recommended_skills_html(recommendations["skills"]), unsafe_allow_html=True)
+                    if "courses" in recommendations:
+                        courses_slot.markdown(course_cards_html(recommendations["courses"]), unsafe_allow_html=True)
+
+                    # Skills and courses only depend on the extracted skills, so both calls
+                    # start together and each section is filled in as soon as it arrives
+                    tasks = {
+                        "skills": lambda emit: recommend_skills(cache, pdf_hash, current_skills),
+                        "courses": lambda emit: recommend_courses(cache, pdf_hash, current_skills),
+                    }
+                    tasks = {name: task for name, task in tasks.items() if name not in recommendations}
+                    for event in stream_fan_out(tasks):
+                        result = event.result
+                        if result is None:
+                            continue
+                        if event.name == "skills":
+                            if result.error:
+                                skills_slot.error(f"Recommendation error: {str(result.error)}")
+                            else:
+                                recommendations["skills"] = result.value or []
+                                skills_slot.markdown(recommended_skills_html(recommendations["skills"]), unsafe_allow_html=True)
+                        elif event.name == "courses":
+                            if result.error:
+                                courses_slot.error(f"Course recommendation error: {str(result.error)}")
+                            else:
+                                recommendations["courses"] = result.value or []
+                                courses_slot.markdown(course_cards_html(recommendations["courses"]), unsafe_allow_html=True)
+
+                for container, role in opened_todos:
+                    with container:
+                        show_todo_list(cache, current_skills, role)
 run()
\ No newline at end of file
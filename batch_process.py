@@ -0,0 +1,139 @@
+# Headless bulk resume analysis.
+#
+#   python batch_process.py Uploaded_Resumes --output batch_results.jsonl
+#
+# PDFs are parsed in a process pool, analyses run on a thread pool, and every
+# Gemini call goes through one process-wide concurrency cap. Each finished
+# resume is appended to the JSONL output right away; re-running the command
+# skips resumes already in the output, and the shared analysis cache means
+# interrupted resumes don't pay for the stages that already finished.
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+from src.analysis import analyze_resume_text
+from src.ingest import ingest_pdf
+from src.cache import get_cache, sha256_bytes
+from src.resources import set_llm_concurrency, warm_up
+from src.metrics import get_registry
+
+load_dotenv()
+
+
+def parse_pdf(path):
+    # Runs in a worker process: hash and text extraction are CPU bound
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        parsed = ingest_pdf(data)
+        return {"file": path, "sha256": sha256_bytes(data), "pages": parsed.page_count, "text": parsed.text}
+    except Exception as e:
+        return {"file": path, "error": f"PDF parsing failed: {str(e)}"}
+
+
+def load_finished(output_path):
+    """
+    sha256 of every resume already written to the output file.
+    """
+    finished = set()
+    if not os.path.exists(output_path):
+        return finished
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by an interrupted run
+                continue
+            # Resumes with failed stages are retried; the newest line wins
+            if record.get("sha256") and not record.get("errors"):
+                finished.add(record["sha256"])
+    return finished
+
+
+def analyze(parsed, cache):
+    start = time.perf_counter()
+    result = analyze_resume_text(parsed["text"], parsed["sha256"], cache)
+    return {
+        "file": os.path.basename(parsed["file"]),
+        "sha256": parsed["sha256"],
+        "pages": parsed["pages"],
+        **result,
+        "elapsed": round(time.perf_counter() - start, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse a folder of resumes and write the results as JSONL")
+    parser.add_argument("input_dir", nargs="?", default="Uploaded_Resumes", help="folder containing PDF resumes")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file to append results to")
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 2, help="processes used to parse PDFs")
+    parser.add_argument("--jobs", type=int, default=16, help="resumes analysed at the same time")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="maximum Gemini calls in flight")
+    parser.add_argument("--metrics", help="write the stage latency, token and cache metrics to this JSON file")
+    args = parser.parse_args()
+
+    set_llm_concurrency(args.llm_concurrency)
+    warm_up()
+    cache = get_cache()
+
+    paths = sorted(glob.glob(os.path.join(args.input_dir, "*.pdf")))
+    finished = load_finished(args.output)
+    print(f"{len(paths)} PDFs found, {len(finished)} already in {args.output}")
+
+    start = time.perf_counter()
+    done = skipped = failed = 0
+    seen = set(finished)
+
+    # Spawned, not forked: warm_up() already has model-loading threads running,
+    # and forking a threaded process can deadlock the children
+    with ProcessPoolExecutor(max_workers=args.parse_workers, mp_context=multiprocessing.get_context("spawn")) as parse_pool, \
+            ThreadPoolExecutor(max_workers=args.jobs) as analysis_pool, \
+            open(args.output, "a", encoding="utf-8") as out:
+
+        def write(record):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+        analyses = []
+        for parsed in parse_pool.map(parse_pdf, paths, chunksize=4):
+            if "error" in parsed:
+                failed += 1
+                print(f"{parsed['file']}: {parsed['error']}")
+                continue
+            # Already in the output, or the same bytes under another file name
+            if parsed["sha256"] in seen:
+                skipped += 1
+                continue
+            seen.add(parsed["sha256"])
+            analyses.append(analysis_pool.submit(analyze, parsed, cache))
+
+        total = len(analyses)
+        for completed, future in enumerate(as_completed(analyses), 1):
+            try:
+                record = future.result()
+                write(record)
+                done += 1
+                if record["errors"]:
+                    print(f"{record['file']}: failed stages {', '.join(record['errors'])}")
+            except Exception as e:
+                failed += 1
+                print(f"Analysis failed: {str(e)}")
+            elapsed = time.perf_counter() - start
+            print(f"[{completed}/{total}] {done / elapsed:.2f} resumes/s, {elapsed:.1f}s elapsed")
+
+    elapsed = time.perf_counter() - start
+    print(f"Finished: {done} analysed, {skipped} skipped, {failed} failed in {elapsed:.1f}s "
+          f"({done / elapsed if elapsed else 0:.2f} resumes/s)")
+
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            json.dump(get_registry().snapshot(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import json
+import random
+import re
+import time
+from src.helper import load_excel_file
+from src.lexical_index import LexicalIndex, write_lexical_index
+from src.course_catalogue import load_course_file, COURSES_PATH
+
+
+# Deterministic stand-ins for Gemini and the role and course vector stores, so the analysis
+# pipeline can be benchmarked without network access or API keys.
+
+
+class FakeMessage:
+    def __init__(self, content, prompt_tokens):
+        self.content = content
+        self.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": max(1, len(content) // 4),
+            "total_tokens": prompt_tokens + max(1, len(content) // 4),
+        }
+
+
+class FakeLLM:
+    """
+    Answers each analysis prompt with a canned response of the right shape.
+    Latency is base_latency plus per_token_latency for every prompt and completion token.
+    """
+
+    def __init__(self, base_latency=0.3, per_token_latency=0.0005, seed=0):
+        self.base_latency = base_latency
+        self.per_token_latency = per_token_latency
+        self.seed = seed
+        self.model_name = "fake-llm"
+
+    def _respond(self, prompt):
+        # Same prompt -> same answer
+        rng = random.Random(f"{self.seed}:{prompt}")
+        if '"experience_level"' in prompt:
+            skills = re.search(r"Skills: (.*)", prompt)
+            return json.dumps({
+                "name": "Bench Candidate",
+                "email": "bench@example.com",
+                "phone": "+91-9876543210",
+                "skills": skills.group(1).split(", ") if skills else ["Python", "SQL"],
+                "experience_level": "Fresher",
+                "education": ["B.E. Computer Science"],
+                "projects": ["Resume analyser"],
+            })
+        if "comma-separated list" in prompt:
+            return ", ".join(f"Skill {rng.randint(1, 99)}" for _ in range(18))
+        if "online courses" in prompt:
+            return "\n".join(
+                f"Course {i} | Learn topic {rng.randint(1, 99)} through hands-on projects | https://example.com/{i} | Programming"
+                for i in range(1, 9)
+            )
+        if "STRICT JSON FORMAT, mapping the role number" in prompt:
+            count = len(re.findall(r"Role \d+:", prompt))
+            return json.dumps({str(i): [f"Step {step}" for step in range(1, 6)] for i in range(1, count + 1)})
+        return "\n".join(f"{step}. Step {step} towards the role" for step in range(1, 7))
+
+    def invoke(self, prompt, **kwargs):
+        content = self._respond(prompt)
+        message = FakeMessage(content, len(prompt) // 4)
+        time.sleep(self.base_latency + self.per_token_latency * message.usage_metadata["total_tokens"])
+        return message
+
+    def stream(self, prompt, **kwargs):
+        message = self.invoke(prompt)
+        for line in message.content.splitlines(keepends=True):
+            yield FakeMessage(line, 0)
+
+
+class FakeRetriever:
+    """
+    BM25 over the role spreadsheet standing in for the vector store, with a fixed query latency.
+    """
+
+    def __init__(self, k, index, latency=0.05):
+        self.k = k
+        self.index = index
+        self.latency = latency
+
+    def get_relevant_documents(self, query):
+        time.sleep(self.latency)
+        return [self.index.document(position) for position, _ in self.index.search(query, self.k)]
+
+    def invoke(self, query, **kwargs):
+        return self.get_relevant_documents(query)
+
+
+class FakeCourseStore:
+    """
+    BM25 over the course catalogue standing in for the course vector index, with a fixed query latency.
+    """
+
+    def __init__(self, index, latency=0.005):
+        self.index = index
+        self.latency = latency
+
+    def similarity_search_with_score(self, query, k=4):
+        time.sleep(self.latency)
+        return [(self.index.document(position), score) for position, score in self.index.search(query, k)]
+
+
+def build_fake_role_index(path, roles_path="Data/company roles.xlsx"):
+    write_lexical_index(load_excel_file(roles_path), path)
+    return LexicalIndex(path)
+
+
+def build_fake_course_index(path, courses_path=COURSES_PATH):
+    write_lexical_index(load_course_file(courses_path), path)
+    return LexicalIndex(path)
+
+
+def synthetic_resumes(count, vocabulary, seed=0):
+    """
+    Plain-text resumes with random skills from the catalogue vocabulary.
+    """
+    rng = random.Random(seed)
+    resumes = []
+    for i in range(count):
+        skills = rng.sample(vocabulary, min(len(vocabulary), rng.randint(4, 12)))
+        projects = "\n".join(f"Project {j}: built a tool using {rng.choice(skills)}" for j in range(rng.randint(1, 4)))
+        resumes.append(
+            f"Candidate Number{i}\ncandidate{i}@example.com\n+91 98765 {i:05d}\n"
+            f"Skills\n{', '.join(skills)}\n"
+            f"Experience\n{rng.randint(0, 6)} years as a software engineer\n"
+            f"Projects\n{projects}\n"
+            f"Education\nB.E. Computer Science\n"
+        )
+    return resumes
@@ -0,0 +1,164 @@
+# Offline benchmark of the analysis pipeline.
+#
+#   python -m benchmarks.run_benchmarks --concurrency 1 4 16
+#   python -m benchmarks.run_benchmarks --save-baseline    # record benchmarks/baseline.json
+#
+# Gemini and the role and course vector stores are replaced by deterministic fakes
+# (benchmarks/fakes.py) with configurable latency, so runs need no API keys and
+# are repeatable. Each analysis runs extraction, role retrieval, skill and
+# course recommendations and one to-do list, on the PDFs in Uploaded_Resumes/
+# plus synthetic resumes. The report has per-stage p50/p95
+# latency and throughput for every concurrency level, and peak memory; with a
+# baseline present, regressions beyond --tolerance make the command exit with 1.
+import argparse
+import glob
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.resources import LimitedLLM, LLM_MAX_CONCURRENCY, override_resource
+from src.analysis import (
+    ROLE_TOP_K, extract_resume_data, extract_resume_data_from_text, skill_recommender,
+    course_recommender, get_company_role_recommendations, generate_todo_list_for_role
+)
+from src.extractor import skill_vocabulary
+from benchmarks.fakes import FakeLLM, FakeRetriever, FakeCourseStore, build_fake_role_index, build_fake_course_index, synthetic_resumes
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+STAGES = ["extract", "roles", "skills", "courses", "todo", "total"]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def analyse_one(source):
+    """
+    Run one resume (a PDF path or resume text) through every stage; returns {stage: seconds}.
+    """
+    timings = {}
+    start = time.perf_counter()
+
+    def stage(name, fn):
+        stage_start = time.perf_counter()
+        value = fn()
+        timings[name] = time.perf_counter() - stage_start
+        return value
+
+    if source.lower().endswith(".pdf"):
+        resume = stage("extract", lambda: extract_resume_data(source))
+    else:
+        resume = stage("extract", lambda: extract_resume_data_from_text(source))
+    skills = resume.get("skills", [])
+    roles = stage("roles", lambda: get_company_role_recommendations(skills))
+    stage("skills", lambda: skill_recommender(skills))
+    stage("courses", lambda: course_recommender(skills))
+    if roles:
+        stage("todo", lambda: generate_todo_list_for_role(skills, roles[0]))
+    timings["total"] = time.perf_counter() - start
+    return timings
+
+
+def run_level(sources, concurrency):
+    samples = {name: [] for name in STAGES}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for timings in executor.map(analyse_one, sources):
+            for name, seconds in timings.items():
+                samples[name].append(seconds)
+    elapsed = time.perf_counter() - start
+    return {
+        "analyses": len(sources),
+        "throughput": round(len(sources) / elapsed, 3),
+        "stages": {
+            name: {"p50_ms": round(1000 * percentile(values, 0.5), 2), "p95_ms": round(1000 * percentile(values, 0.95), 2)}
+            for name, values in samples.items() if values
+        },
+    }
+
+
+def compare(report, baseline, tolerance, min_delta_ms=5.0):
+    """
+    Human-readable regressions of report against baseline. Stages slower by less
+    than min_delta_ms are ignored, since sub-millisecond stages are mostly noise.
+    """
+    regressions = []
+    for level, run in report["runs"].items():
+        base = baseline.get("runs", {}).get(level)
+        if not base:
+            continue
+        if run["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"concurrency {level}: throughput {run['throughput']}/s vs {base['throughput']}/s")
+        for name, stats in run["stages"].items():
+            base_p95 = base["stages"].get(name, {}).get("p95_ms")
+            if base_p95 and stats["p95_ms"] > max(base_p95 * (1 + tolerance), base_p95 + min_delta_ms):
+                regressions.append(f"concurrency {level}: {name} p95 {stats['p95_ms']}ms vs {base_p95}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline offline with a fake LLM and retriever")
+    parser.add_argument("--resumes-dir", default="Uploaded_Resumes", help="folder with real PDF resumes")
+    parser.add_argument("--synthetic", type=int, default=20, help="number of synthetic text resumes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="concurrent analyses to measure")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="fake LLM base latency in seconds")
+    parser.add_argument("--llm-token-latency", type=float, default=0.0005, help="fake LLM latency per token in seconds")
+    parser.add_argument("--retriever-latency", type=float, default=0.05, help="fake retriever latency in seconds")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before a stage counts as regressed")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore p95 slowdowns smaller than this")
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    override_resource("llm", LimitedLLM(FakeLLM(args.llm_latency, args.llm_token_latency), LLM_MAX_CONCURRENCY))
+    with tempfile.TemporaryDirectory() as tmp:
+        index = build_fake_role_index(os.path.join(tmp, "roles.json"))
+        course_index = build_fake_course_index(os.path.join(tmp, "courses.json"))
+    override_resource(f"retriever_k{ROLE_TOP_K}", FakeRetriever(ROLE_TOP_K, index, args.retriever_latency))
+    override_resource("course_store", FakeCourseStore(course_index))
+
+    sources = sorted(glob.glob(os.path.join(args.resumes_dir, "*.pdf")))
+    sources += synthetic_resumes(args.synthetic, list(skill_vocabulary().values()))
+    print(f"{len(sources)} resumes ({len(sources) - args.synthetic} PDFs, {args.synthetic} synthetic)")
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("baseline", "save_baseline", "output", "min_delta_ms")},
+        "runs": {},
+    }
+    for concurrency in args.concurrency:
+        run = run_level(sources, concurrency)
+        report["runs"][str(concurrency)] = run
+        print(f"concurrency {concurrency}: {run['throughput']} analyses/s")
+        for name, stats in run["stages"].items():
+            print(f"  {name:<8} p50 {stats['p50_ms']:>9.2f}ms  p95 {stats['p95_ms']:>9.2f}ms")
+    # ru_maxrss is in kilobytes on Linux
+    report["peak_memory_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    print(f"peak memory: {report['peak_memory_mb']} MB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_delta_ms)
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
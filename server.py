@@ -0,0 +1,116 @@
+# HTTP API for resume analysis.
+#
+#   python server.py                      # listens on SERVICE_HOST:SERVICE_PORT (0.0.0.0:8000)
+#
+#   POST /analyze          PDF as multipart field "file" or as the raw body
+#                          ?wait=<seconds> returns the finished job if it completes in time
+#                          (capped at SERVICE_MAX_WAIT, 60s)
+#                          ?todos=0 skips to-do lists (fetch them per role from /todo)
+#   GET  /jobs/<job_id>    job status and, once done, the analysis result
+#   POST /todo             {"skills": [...], "role": {...}} -> {"todo": "..."}
+#   GET  /health           liveness and warm-up state
+#   GET  /metrics          Prometheus text metrics
+#
+# Jobs run on a bounded worker pool (SERVICE_WORKERS) and are kept in a local
+# job store; when SERVICE_MAX_QUEUE jobs are pending, new ones get a 503.
+import os
+from flask import Flask, jsonify, request
+from dotenv import load_dotenv
+from src.analysis import ROLE_FIELDS
+from src.resources import warm_up, is_warm
+from src.service import get_service, QueueFull
+from src.metrics import get_registry
+
+load_dotenv()
+
+app = Flask(__name__)
+# Reject oversized uploads before they are read into memory
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_PDF_BYTES", str(10 * 1024 * 1024))) + 64 * 1024
+# Longest ?wait= a request may block a server thread for; clients poll /jobs/<id> after that
+MAX_WAIT_SECONDS = float(os.getenv("SERVICE_MAX_WAIT", "60"))
+
+
+def job_response(job, status_code=200):
+    response = jsonify(job)
+    response.status_code = status_code
+    if job["status"] in ("queued", "running"):
+        response.status_code = 202
+        response.headers["Location"] = f"/jobs/{job['job_id']}"
+    return response
+
+
+@app.post("/analyze")
+def analyze():
+    try:
+        wait = min(float(request.args.get("wait", "0")), MAX_WAIT_SECONDS)
+    except ValueError:
+        return jsonify({"error": "wait must be a number of seconds"}), 400
+
+    upload = request.files.get("file")
+    pdf_bytes = upload.read() if upload else request.get_data()
+    if not pdf_bytes:
+        return jsonify({"error": "no PDF in the request"}), 400
+    filename = upload.filename if upload else request.args.get("filename", "")
+
+    service = get_service()
+    try:
+        job = service.submit(pdf_bytes, filename, include_todos=request.args.get("todos", "1") != "0")
+    except QueueFull as e:
+        return jsonify({"error": f"service busy: {str(e)}"}), 503
+
+    if wait > 0:
+        job = service.wait(job["job_id"], wait)
+    return job_response(job)
+
+
+@app.get("/jobs/<job_id>")
+def get_job(job_id):
+    job = get_service().get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return job_response(job)
+
+
+def todo_request_error(payload):
+    """
+    Why a /todo payload can't be used, or None when it is valid.
+    """
+    role = payload.get("role")
+    if not isinstance(role, dict) or not isinstance(role.get("id"), str):
+        return "a role from an analysis result is required"
+    missing = [field for field in ROLE_FIELDS if not isinstance(role.get(field), str)]
+    if missing:
+        return f"role is missing {', '.join(missing)}"
+    skills = payload.get("skills", [])
+    if not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills):
+        return "skills must be a list of strings"
+    return None
+
+
+@app.post("/todo")
+def todo():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        payload = {}
+    error = todo_request_error(payload)
+    if error:
+        return jsonify({"error": error}), 400
+    try:
+        return jsonify({"todo": get_service().todo(payload.get("skills", []), payload["role"])})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 502
+
+
+@app.get("/health")
+def health():
+    return jsonify({"status": "ok", "warm": is_warm()})
+
+
+@app.get("/metrics")
+def metrics():
+    return get_registry().prometheus_text(), 200, {"Content-Type": "text/plain; version=0.0.4"}
+
+
+if __name__ == "__main__":
+    warm_up()
+    app.run(host=os.getenv("SERVICE_HOST", "0.0.0.0"), port=int(os.getenv("SERVICE_PORT", "8000")), threaded=True)
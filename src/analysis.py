@@ -0,0 +1,543 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.resources import get_llm, get_retriever, get_course_store, LLM_MODEL
+from src.concurrency import fan_out
+from src.cache import make_key
+from src.metrics import timed
+from src.prompt import PROMPT_VERSION
+from src.ingest import ingest_pdf, budget_resume_text
+from src.skill_gap import get_skill_index
+from src.course_catalogue import search_courses
+from src.extractor import pre_extract, hints_for_prompt, merge_extractions, FAST_EXTRACTION_CONFIDENCE
+
+
+# Resume analysis pipeline: Gemini extraction and recommendations plus
+# company role retrieval. Nothing here touches Streamlit, so these functions
+# are safe to run on worker threads; failures are raised to the caller.
+
+REQUIRED_FIELDS = ["name", "email", "skills"]
+
+# Number of company roles shown on the report
+ROLE_TOP_K = int(os.getenv("ROLE_TOP_K", "5"))
+
+# "llm": Gemini only; "hints": local pre-extraction is sent to Gemini as hints
+# and merged with its answer; "fast": skip Gemini when the local result is confident
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "hints")
+
+# "local": rank missing skills from the role catalogue; "llm": ask Gemini;
+# "enrich": catalogue skills first, topped up with Gemini suggestions
+SKILL_RECOMMENDER = os.getenv("SKILL_RECOMMENDER", "local")
+RECOMMENDED_SKILL_COUNT = 18
+
+# "local": vector lookup in the course catalogue built by store_index.py;
+# "rerank": a catalogue shortlist reordered by Gemini, with a reason per course;
+# "llm": Gemini writes the list (also used while no catalogue is indexed)
+COURSE_RECOMMENDER = os.getenv("COURSE_RECOMMENDER", "local")
+RECOMMENDED_COURSE_COUNT = 5
+
+EMPTY_RESUME = {
+    "name": "",
+    "email": "",
+    "phone": "",
+    "skills": [],
+    "experience_level": "Fresher",
+    "education": [],
+    "projects": []
+}
+
+
+def missing_required_fields(data):
+    return [field for field in REQUIRED_FIELDS if field not in data or not data[field]]
+
+
+def extract_resume_data(pdf_path):
+    with open(pdf_path, "rb") as f:
+        parsed = ingest_pdf(f.read())
+    return extract_resume_data_from_text(parsed.text)
+
+
+@timed("extract")
+def extract_resume_data_from_text(text, mode=EXTRACTION_MODE):
+    local_data, confidence = pre_extract(text) if mode != "llm" else (None, 0.0)
+    if mode == "fast" and confidence >= FAST_EXTRACTION_CONFIDENCE and not missing_required_fields(local_data):
+        # Skills only seen in running text need the LLM to confirm them
+        return {field: value for field, value in local_data.items() if field != "possible_skills"}
+
+    hints = hints_for_prompt(local_data) if local_data else ""
+    if hints:
+        hints = f"""
+    Already detected (keep these, add anything missing; keep possible skills only if the resume confirms them):
+    {hints}
+    """
+
+    # Create structured prompt
+    prompt = f"""
+    Analyze this resume and extract information in STRICT JSON FORMAT:
+    {{
+        "name": "Full name",
+        "email": "Email address",
+        "phone": "Phone number",
+        "skills": ["list", "of", "technical", "skills"],
+        "experience_level": "Fresher/Intermediate/Experienced",
+        "education": ["Education entries"],
+        "projects": ["Project descriptions"]
+    }}
+
+    Rules:
+    1. Phone format: +XX-XXXXXXXXXX
+    2. Skills must be technical terms
+    3. Experience level based on work duration
+    4. Return empty values if not found
+    {hints}
+    Resume Content:
+    {budget_resume_text(text)}
+    """
+
+    # Get Gemini response
+    response = get_llm().invoke(prompt)
+
+    # Clean and parse JSON
+    json_str = response.content.strip()
+    json_str = json_str.replace('```json', '').replace('```', '')
+    data = json.loads(json_str)
+    if local_data:
+        data = merge_extractions(data, local_data)
+
+    # Fill required fields that came back empty
+    for field in missing_required_fields(data):
+        data[field] = "" if field != "skills" else []
+
+    return data
+
+
+@timed("skills")
+def skill_recommender(current_skills, mode=SKILL_RECOMMENDER):
+    if mode == "llm":
+        return llm_skill_recommender(current_skills)
+
+    skills = get_skill_index().recommend(current_skills, RECOMMENDED_SKILL_COUNT)
+    if mode == "enrich" and len(skills) < RECOMMENDED_SKILL_COUNT:
+        try:
+            known = {skill.lower() for skill in list(current_skills) + skills}
+            extra = [skill for skill in llm_skill_recommender(current_skills) if skill and skill.lower() not in known]
+            skills += extra[:RECOMMENDED_SKILL_COUNT - len(skills)]
+        except Exception:
+            # Enrichment is optional; the catalogue ranking stands on its own
+            pass
+    return skills
+
+
+def recommend_skills(cache, pdf_hash, current_skills, mode=SKILL_RECOMMENDER):
+    """
+    skill_recommender, cached per PDF when it involves Gemini.
+    """
+    if mode == "local":
+        # Takes milliseconds, and caching would only go stale when the catalogue changes
+        return skill_recommender(current_skills, mode)
+    return cache.get_or_compute(analysis_cache_key(pdf_hash, f"skills:{mode}"), lambda: skill_recommender(current_skills, mode))
+
+
+def llm_skill_recommender(current_skills):
+    prompt = f"""
+    Recommend {RECOMMENDED_SKILL_COUNT} most important technical skills to add to these existing skills: {', '.join(current_skills)}.
+    Focus on in-demand skills for software development roles.
+    Return only a comma-separated list, no other text.
+    """
+    response = get_llm().invoke(prompt)
+    return [skill.strip() for skill in response.content.split(",")]
+
+
+@timed("courses")
+def course_recommender(skills, mode=COURSE_RECOMMENDER):
+    store = get_course_store()
+    if mode == "llm" or store is None:
+        return llm_course_recommender(skills)
+
+    # Courses should close the gap to the closest roles, not repeat known skills
+    gaps = get_skill_index().recommend(skills, RECOMMENDED_SKILL_COUNT)
+    if mode != "rerank":
+        return search_courses(store, skills, gaps, RECOMMENDED_COURSE_COUNT)
+
+    shortlist = search_courses(store, skills, gaps, 2 * RECOMMENDED_COURSE_COUNT)
+    try:
+        return llm_rerank_courses(skills, gaps, shortlist)[:RECOMMENDED_COURSE_COUNT]
+    except Exception:
+        # Reranking is optional; the catalogue order stands on its own
+        return shortlist[:RECOMMENDED_COURSE_COUNT]
+
+
+def recommend_courses(cache, pdf_hash, current_skills, mode=COURSE_RECOMMENDER):
+    """
+    course_recommender, cached per PDF when it involves Gemini.
+    """
+    if mode == "local" and get_course_store() is not None:
+        # A vector lookup; caching would only go stale when the catalogue changes
+        return course_recommender(current_skills, mode)
+    return cache.get_or_compute(analysis_cache_key(pdf_hash, f"courses:{mode}"), lambda: course_recommender(current_skills, mode))
+
+
+def llm_rerank_courses(skills, gaps, courses):
+    """
+    Reorder catalogue courses with Gemini, adding a one-line reason to each course it picks.
+    Courses it leaves out keep their order after the picked ones.
+    """
+    if not courses:
+        return []
+    course_lines = "\n".join(
+        f"    {i}. {course['title']} ({course['provider']}): {course['description']} Skills: {', '.join(course['skills'])}"
+        for i, course in enumerate(courses, 1)
+    )
+    prompt = f"""
+    The user has these skills: {', '.join(skills)}.
+    Skills they are missing for the roles they match: {', '.join(gaps)}.
+    Candidate courses:
+{course_lines}
+
+    Pick the {RECOMMENDED_COURSE_COUNT} courses that best close the gap, best first, and say in one sentence why each fits this user.
+    Respond in STRICT JSON FORMAT, a list of {{"course": <number>, "reason": "<sentence>"}}
+    """
+    response = get_llm().invoke(prompt)
+    picks = json.loads(response.content.strip().replace('```json', '').replace('```', ''))
+
+    ranked, used = [], set()
+    for pick in picks if isinstance(picks, list) else []:
+        try:
+            position = int(pick["course"]) - 1
+        except (TypeError, KeyError, ValueError):
+            continue
+        if 0 <= position < len(courses) and position not in used:
+            used.add(position)
+            ranked.append({**courses[position], "reason": str(pick.get("reason", "")).strip()})
+    return ranked + [course for position, course in enumerate(courses) if position not in used]
+
+
+def llm_course_recommender(skills):
+    prompt = f"""
+    Recommend 8 relevant online courses for someone with these skills: {', '.join(skills)}.
+    Respond in this EXACT format for each course:
+    "Course Title | Description (15 words) | URL | Category (Programming/Data Science/Web Dev/Design/Business)"
+
+    Example:
+    "Python Crash Course | Learn Python fundamentals through hands-on projects | https://example.com | Programming"
+
+    Return only the 8 course entries line by line, no additional text.
+    """
+    response = get_llm().invoke(prompt)
+
+    # Process response
+    courses = []
+    for line in response.content.split("\n"):
+        if "|" in line:
+            parts = [p.strip() for p in line.split("|")]
+            if len(parts) == 4:
+                # Always use a static placeholder image with the category as text
+                thumbnail = f"https://placehold.co/400x240?text={parts[3].replace(' ', '+')}"
+                courses.append({
+                    "title": parts[0],
+                    "description": parts[1],
+                    "url": parts[2],
+                    "category": parts[3],
+                    "thumbnail": thumbnail
+                })
+    return courses[:RECOMMENDED_COURSE_COUNT]
+
+
+ROLE_FIELDS = ["company", "role", "responsibilities", "language", "knowledge", "experience", "level", "package"]
+
+# page_content labels, only needed for vectors indexed before roles carried full metadata
+_LEGACY_LABELS = {
+    "Company": "company",
+    "Role": "role",
+    "Responsibilities": "responsibilities",
+    "Language": "language",
+    "Essential Knowledge": "knowledge",
+    "Experience Required": "experience",
+    "Level of Role": "level",
+    "Package Details": "package",
+}
+
+
+def _parse_role_doc(doc):
+    metadata = doc.metadata or {}
+    if all(field in metadata for field in ROLE_FIELDS):
+        role = {field: str(metadata[field]) for field in ROLE_FIELDS}
+    else:
+        # Legacy chunks: rebuild the fields from "Label: value" lines
+        role = dict.fromkeys(ROLE_FIELDS, "")
+        for line in doc.page_content.split('\n'):
+            if ':' in line:
+                key, value = line.split(':', 1)
+                if key.strip() in _LEGACY_LABELS:
+                    role[_LEGACY_LABELS[key.strip()]] = value.strip()
+    # Only keep it if essential fields are present
+    if not role["company"] or not role["role"]:
+        return None
+    role["id"] = metadata.get("row_id") or f"{role['company']}|{role['role']}".lower()
+    return role
+
+
+class RoleSearch:
+    """
+    One company role retrieval per analysis. The query runs once, with the largest
+    k any consumer needs, and every consumer slices the same parsed result.
+    """
+
+    def __init__(self, skills, max_k=ROLE_TOP_K):
+        self.query = ", ".join(skills)
+        self.max_k = max_k
+        self._roles = None
+        self._lock = threading.Lock()
+
+    def _search(self):
+        if not self.query.strip():
+            return []
+        with timed("retrieve", k=self.max_k):
+            docs = get_retriever(self.max_k).get_relevant_documents(self.query)
+        # Several legacy chunks can belong to one role; keep its best match only
+        roles, seen = [], set()
+        for role in map(_parse_role_doc, docs):
+            if role is not None and role["id"] not in seen:
+                seen.add(role["id"])
+                roles.append(role)
+        return roles
+
+    def roles(self, top_k=None):
+        with self._lock:
+            if self._roles is None:
+                self._roles = self._search()
+        return self._roles[:top_k or self.max_k]
+
+
+def get_company_role_recommendations(skills, top_k=ROLE_TOP_K):
+    """
+    Given a list of user skills, retrieve the most relevant company roles from the vector store.
+    """
+    return RoleSearch(skills, max_k=top_k).roles()
+
+
+def _todo_prompt(user_skills, role):
+    return f"""
+    The user has these skills: {', '.join(user_skills)}.
+    The target company role is:
+    Company: {role['company']}
+    Role: {role['role']}
+    Responsibilities: {role['responsibilities']}
+    Language: {role['language']}
+    Essential Knowledge: {role['knowledge']}
+    Experience Required: {role['experience']}
+    Level: {role['level']}
+    Package: {role['package']}
+
+    Please provide a step-by-step, actionable to-do list (5-7 items) for the user to become a strong candidate for this role.
+    Focus on skills to learn, certifications, projects, networking, and other career moves.
+    Format as a numbered list.
+    """
+
+
+@timed("todo")
+def generate_todo_list_for_role(user_skills, role):
+    """
+    Use Gemini LLM to generate a personalized to-do list for the user to attain the given role.
+    """
+    response = get_llm().invoke(_todo_prompt(user_skills, role))
+    return response.content.strip()
+
+
+def stream_todo_list_for_role(user_skills, role):
+    """
+    Same as generate_todo_list_for_role, but yields the to-do list text chunk by chunk as Gemini produces it.
+    """
+    for chunk in get_llm().stream(_todo_prompt(user_skills, role), metrics_stage="todo_stream"):
+        if chunk.content:
+            yield chunk.content
+
+
+def _format_todo(value):
+    # Accept either a ready numbered list or a JSON list of steps
+    if isinstance(value, list):
+        steps = [str(step).strip() for step in value if str(step).strip()]
+        return "\n".join(f"{i}. {step}" for i, step in enumerate(steps, 1))
+    if isinstance(value, str):
+        return value.strip()
+    return ""
+
+
+@timed("todo_batch")
+def generate_todo_lists_for_roles(user_skills, roles):
+    """
+    Generate to-do lists for several roles with a single Gemini call.
+    Returns one to-do list per role, in order. Roles missing from the response
+    fall back to generate_todo_list_for_role; None marks a role that still failed.
+    """
+    if not roles:
+        return []
+
+    role_blocks = "\n".join(
+        f"""
+    Role {i}:
+    Company: {role['company']}
+    Role: {role['role']}
+    Responsibilities: {role['responsibilities']}
+    Language: {role['language']}
+    Essential Knowledge: {role['knowledge']}
+    Experience Required: {role['experience']}
+    Level: {role['level']}
+    Package: {role['package']}"""
+        for i, role in enumerate(roles, 1)
+    )
+    prompt = f"""
+    The user has these skills: {', '.join(user_skills)}.
+    The target company roles are:
+    {role_blocks}
+
+    For EACH role, provide a step-by-step, actionable to-do list (5-7 items) for the user to become a strong candidate for it.
+    Focus on skills to learn, certifications, projects, networking, and other career moves.
+    Respond in STRICT JSON FORMAT, mapping the role number to its list of steps:
+    {{"1": ["step", "step"], "2": ["step", "step"]}}
+    """
+
+    todos = {}
+    try:
+        response = get_llm().invoke(prompt)
+        json_str = response.content.strip().replace('```json', '').replace('```', '')
+        data = json.loads(json_str)
+        if isinstance(data, dict):
+            for key, value in data.items():
+                todo = _format_todo(value)
+                if todo:
+                    todos[str(key).strip()] = todo
+    except Exception:
+        # Treat a failed or malformed batch as every role missing
+        todos = {}
+
+    # Only the roles the batch didn't cover get their own call
+    missing = {str(i): role for i, role in enumerate(roles, 1) if str(i) not in todos}
+    results = fan_out({
+        key: (lambda role=role: generate_todo_list_for_role(user_skills, role))
+        for key, role in missing.items()
+    })
+    for key, result in results.items():
+        if result.error is None and result.value:
+            todos[key] = result.value
+
+    return [todos.get(str(i)) for i in range(1, len(roles) + 1)]
+
+
+def analysis_cache_key(pdf_hash, stage):
+    """
+    Cache key of one analysis stage for a PDF, tied to the model and prompt version.
+    """
+    return make_key(pdf_hash, LLM_MODEL, PROMPT_VERSION, stage)
+
+
+def todo_cache_key(user_skills, role):
+    """
+    To-do lists depend only on the skill set and the role, so they are shared
+    across resumes, sessions and reruns with the same (normalised) skills.
+    """
+    skills = sorted({skill.strip().lower() for skill in user_skills if skill.strip()})
+    skills_hash = hashlib.sha256("\n".join(skills).encode("utf-8")).hexdigest()
+    return make_key("todo", LLM_MODEL, PROMPT_VERSION, skills_hash, role["id"])
+
+
+def cached_todo_lists(cache, user_skills, roles):
+    """
+    To-do lists for roles, cached per role; all uncached roles share one batched call.
+    """
+    keys = [todo_cache_key(user_skills, role) for role in roles]
+    todos = [cache.get(key) for key in keys]
+    missing = [i for i, todo in enumerate(todos) if todo is None]
+    generated = generate_todo_lists_for_roles(user_skills, [roles[i] for i in missing])
+    for i, todo in zip(missing, generated):
+        if todo:
+            cache.set(keys[i], todo)
+            todos[i] = todo
+    return todos
+
+
+# Background generation of the to-do lists users are most likely to open
+TODO_PREFETCH_ROLES = int(os.getenv("TODO_PREFETCH_ROLES", "1"))
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="todo-prefetch")
+_prefetching = {}
+_prefetch_lock = threading.Lock()
+
+
+def prefetch_todo_lists(cache, user_skills, roles, count=TODO_PREFETCH_ROLES):
+    """
+    Start generating the to-do lists of the first `count` roles in the background,
+    skipping roles that are already cached or being generated.
+    """
+    with _prefetch_lock:
+        wanted = [
+            role for role in roles[:count]
+            if todo_cache_key(user_skills, role) not in _prefetching and cache.get(todo_cache_key(user_skills, role)) is None
+        ]
+        if not wanted:
+            return None
+        keys = [todo_cache_key(user_skills, role) for role in wanted]
+        future = _prefetch_executor.submit(cached_todo_lists, cache, user_skills, wanted)
+        for key in keys:
+            _prefetching[key] = future
+
+    def forget(_):
+        with _prefetch_lock:
+            for key in keys:
+                _prefetching.pop(key, None)
+
+    future.add_done_callback(forget)
+    return future
+
+
+def pending_todo_prefetch(user_skills, role):
+    """
+    The in-flight prefetch that will produce this role's to-do list, if any.
+    """
+    with _prefetch_lock:
+        return _prefetching.get(todo_cache_key(user_skills, role))
+
+
+def analyze_resume_text(text, pdf_hash, cache, include_todos=True):
+    """
+    Run the whole analysis for one resume's text. Returns a dict with the resume
+    data, roles, skills, courses and to-do lists, plus an "errors" mapping of
+    stage -> message for the stages that failed. With include_todos=False the
+    to-do lists are left for the caller to fetch on demand (all None).
+    """
+    errors = {}
+    try:
+        resume_data = cache.get_or_compute(
+            analysis_cache_key(pdf_hash, f"resume:{EXTRACTION_MODE}"), lambda: extract_resume_data_from_text(text),
+            # Incomplete extractions are retried on the next run instead of cached
+            should_cache=lambda data: not missing_required_fields(data)
+        )
+    except Exception as e:
+        errors["resume"] = str(e)
+        resume_data = dict(EMPTY_RESUME)
+    current_skills = resume_data.get("skills", [])
+
+    try:
+        roles = RoleSearch(current_skills).roles()
+    except Exception as e:
+        errors["roles"] = str(e)
+        roles = []
+
+    results = fan_out({
+        "skills": lambda: recommend_skills(cache, pdf_hash, current_skills),
+        "courses": lambda: recommend_courses(cache, pdf_hash, current_skills),
+        "todos": lambda: cached_todo_lists(cache, current_skills, roles) if include_todos else [None] * len(roles),
+    })
+    for stage, result in results.items():
+        if result.error is not None:
+            errors[stage] = str(result.error)
+
+    return {
+        "resume": resume_data,
+        "roles": roles,
+        "skills": results["skills"].value or [],
+        "courses": results["courses"].value or [],
+        "todos": results["todos"].value or [None] * len(roles),
+        "errors": errors,
+    }
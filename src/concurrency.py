@@ -0,0 +1,76 @@
+import os
+import queue
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Run independent blocking calls (mostly llm.invoke) side by side.
+# Each task is isolated: an exception or a timeout in one task is returned
+# as that task's error and never affects the others.
+
+MAX_CONCURRENCY = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "8"))
+CALL_TIMEOUT = float(os.getenv("ANALYSIS_CALL_TIMEOUT", "60"))
+
+TaskResult = namedtuple("TaskResult", ["value", "error", "elapsed"])
+
+# Either a partial value emitted by a running task, or its final TaskResult
+TaskEvent = namedtuple("TaskEvent", ["name", "partial", "result"])
+
+
+def stream_fan_out(tasks, max_workers=MAX_CONCURRENCY, timeout=CALL_TIMEOUT):
+    """
+    Run a {name: callable(emit)} mapping concurrently and yield TaskEvents as they happen.
+    A task may call emit(value) to publish partial results (e.g. streamed tokens);
+    exactly one final event with a TaskResult is yielded per task. The timeout
+    applies per call, counted from when the call starts running.
+    """
+    if not tasks:
+        return
+
+    events = queue.Queue()
+    started = {}
+
+    def run(name, fn):
+        started[name] = time.perf_counter()
+        try:
+            value = fn(lambda partial: events.put(TaskEvent(name, partial, None)))
+            events.put(TaskEvent(name, None, TaskResult(value, None, time.perf_counter() - started[name])))
+        except Exception as e:
+            events.put(TaskEvent(name, None, TaskResult(None, e, time.perf_counter() - started[name])))
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="fan-out")
+    futures = {name: executor.submit(run, name, fn) for name, fn in tasks.items()}
+    pending = set(tasks)
+    try:
+        while pending:
+            try:
+                event = events.get(timeout=0.05)
+                if event.name in pending:
+                    if event.result is not None:
+                        pending.discard(event.name)
+                    yield event
+            except queue.Empty:
+                pass
+            now = time.perf_counter()
+            for name in list(pending):
+                if name in started and now - started[name] > timeout:
+                    # The thread can't be killed; we just stop waiting for it
+                    futures[name].cancel()
+                    pending.discard(name)
+                    yield TaskEvent(name, None, TaskResult(None, TimeoutError(f"timed out after {timeout:g}s"), now - started[name]))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fan_out(tasks, max_workers=MAX_CONCURRENCY, timeout=CALL_TIMEOUT):
+    """
+    Run a {name: callable} mapping concurrently and return {name: TaskResult}.
+    max_workers=1 runs the tasks one after another.
+    """
+    results = {}
+    streaming_tasks = {name: (lambda emit, fn=fn: fn()) for name, fn in tasks.items()}
+    for event in stream_fan_out(streaming_tasks, max_workers, timeout):
+        if event.result is not None:
+            results[event.name] = event.result
+    return results
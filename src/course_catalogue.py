@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import re
+from urllib.parse import quote_plus
+from src.helper import split_skill_list
+from src.metrics import timed
+
+
+# Course recommendations from a local catalogue instead of Gemini.
+# Data/courses.csv (or .xlsx) lists real courses with the skills they teach.
+# store_index.py embeds it with the same incremental pipeline as the roles into
+# a local vector index, so recommending courses is one vector lookup with the
+# candidate's skill gaps and skills, reranked towards courses that teach
+# missing skills rather than ones the candidate already has.
+
+COURSES_PATH = os.getenv("COURSES_PATH", "Data/courses.csv")
+COURSE_INDEX_DIR = os.getenv("COURSE_INDEX_DIR", "Data/course_index")
+
+# Catalogue column -> metadata key; Provider is optional
+COURSE_COLUMNS = {
+    "Title": "title",
+    "Provider": "provider",
+    "Description": "description",
+    "URL": "url",
+    "Category": "category",
+    "Skills": "skills",
+}
+
+# Bump when the document layout or metadata changes so every course is re-indexed
+COURSE_DOC_VERSION = "1"
+
+# Score adjustments, as fractions of a course's skills, on top of the cosine similarity
+GAP_WEIGHT = float(os.getenv("COURSE_GAP_WEIGHT", "0.3"))
+KNOWN_WEIGHT = float(os.getenv("COURSE_KNOWN_WEIGHT", "0.2"))
+# Candidates taken from the vector search per course returned
+CANDIDATE_FACTOR = 4
+
+
+@timed("load_courses")
+def load_course_file(file_path=COURSES_PATH):
+    """
+    One Document per course. Rows without a title or an http(s) link are skipped.
+    """
+    import pandas as pd
+    from langchain.docstore.document import Document
+
+    df = pd.read_csv(file_path) if file_path.lower().endswith(".csv") else pd.read_excel(file_path)
+    df = df.fillna("")
+    documents = []
+    for _, row in df.iterrows():
+        metadata = {key: str(row[column]).strip() if column in row else "" for column, key in COURSE_COLUMNS.items()}
+        if not metadata["title"] or not re.match(r"^https?://", metadata["url"], re.IGNORECASE):
+            continue
+
+        text = f"Course: {metadata['title']}\nDescription: {metadata['description']}\nSkills: {metadata['skills']}\nCategory: {metadata['category']}"
+        # A course is identified by its link; the hash covers every displayed field
+        metadata["row_id"] = hashlib.sha256(metadata["url"].lower().encode()).hexdigest()[:16]
+        metadata["row_hash"] = hashlib.sha256(
+            f"{COURSE_DOC_VERSION}\n{text}\n{json.dumps(metadata, sort_keys=True)}".encode()
+        ).hexdigest()
+        documents.append(Document(page_content=text, metadata=metadata))
+    return documents
+
+
+def course_from_doc(doc):
+    metadata = doc.metadata or {}
+    category = metadata.get("category", "")
+    return {
+        "id": metadata.get("row_id", ""),
+        "title": metadata.get("title", ""),
+        "provider": metadata.get("provider", ""),
+        "description": metadata.get("description", ""),
+        "url": metadata.get("url", ""),
+        "category": category,
+        "skills": split_skill_list(metadata.get("skills", "")),
+        # Static placeholder image with the category as text
+        "thumbnail": f"https://placehold.co/400x240?text={quote_plus(category or 'Course')}",
+    }
+
+
+def search_courses(store, skills, gaps, k):
+    """
+    The k catalogue courses that best match the skill gaps (listed first in the
+    query) and the candidate's skills, best first.
+    """
+    query = ", ".join(list(gaps) + list(skills))
+    if not query.strip():
+        return []
+
+    known = {skill.strip().lower() for skill in skills}
+    wanted = {skill.strip().lower() for skill in gaps}
+    ranked, seen = [], set()
+    for doc, score in store.similarity_search_with_score(query, k=k * CANDIDATE_FACTOR):
+        course = course_from_doc(doc)
+        if course["url"] in seen:
+            continue
+        seen.add(course["url"])
+        taught = {skill.lower() for skill in course["skills"]}
+        if taught:
+            score += GAP_WEIGHT * len(taught & wanted) / len(taught)
+            score -= KNOWN_WEIGHT * len(taught & known) / len(taught)
+        ranked.append((score, course))
+    ranked.sort(key=lambda item: -item[0])
+    return [course for _, course in ranked[:k]]
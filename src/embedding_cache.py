@@ -0,0 +1,105 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.metrics import count, timed
+
+
+# Persistent cache in front of an embeddings model.
+# Vectors are stored as float16 (or float32) blobs in SQLite, keyed by model name
+# and a hash of the whitespace-normalised text, with an in-memory LRU in front.
+# All misses of one call are embedded together in a single embed_documents call.
+
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")
+EMBEDDING_LRU_SIZE = int(os.getenv("EMBEDDING_LRU_SIZE", "4096"))
+
+
+def normalize_text(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(self, embedding, path=EMBEDDING_CACHE_PATH, dtype=EMBEDDING_CACHE_DTYPE, lru_size=EMBEDDING_LRU_SIZE):
+        self.embedding = embedding
+        self.model_name = getattr(embedding, "model_name", type(embedding).__name__)
+        self.dtype = np.dtype(dtype)
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    def _key(self, kind, text):
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{self.model_name}:{kind}:{digest}"
+
+    def _remember(self, key, vector):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _lookup(self, keys):
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[key] = self._lru[key]
+            missing = [key for key in keys if key not in found]
+            # SQLite caps the number of bound parameters, so look up in chunks
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM vectors WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=self.dtype).astype(np.float32).tolist()
+                    found[key] = vector
+                    self._remember(key, vector)
+        return found
+
+    def _store(self, items):
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, vector)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=self.dtype).tobytes()) for key, vector in items]
+            )
+            self._conn.commit()
+
+    def _embed(self, kind, texts, compute):
+        keys = [self._key(kind, text) for text in texts]
+        found = self._lookup(set(keys))
+
+        # Embed each distinct missing text once, all in one model call
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        count("embedding_cache", len(texts) - len(missing), result="hit")
+        count("embedding_cache", len(missing), result="miss")
+        if missing:
+            with timed("embed", kind=kind, texts=len(missing)):
+                vectors = compute(list(missing.values()))
+            new_items = list(zip(missing.keys(), [list(map(float, vector)) for vector in vectors]))
+            self._store(new_items)
+            found.update(new_items)
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts):
+        return self._embed("doc", list(texts), self.embedding.embed_documents)
+
+    def embed_query(self, text):
+        # Queries may be embedded differently from documents by some models
+        return self._embed("query", [text], lambda texts: [self.embedding.embed_query(texts[0])])[0]
@@ -0,0 +1,185 @@
+import os
+import re
+from functools import lru_cache
+from src.helper import ROLES_PATH, load_role_skills
+from src.ingest import compact_text, split_sections
+from src.metrics import timed
+
+
+# Deterministic, local pre-extraction of resume fields.
+# Contact details come from regexes and skills from a dictionary built from the
+# role catalogue, so they cost no tokens. The result is either sent to Gemini as
+# hints and merged with its answer, or, in fast mode, used on its own when it
+# is complete enough.
+
+# Common skills the role catalogue doesn't mention yet
+COMMON_SKILLS = [
+    "JavaScript", "TypeScript", "React", "Angular", "Vue", "Node.js", "Express", "Django", "Flask",
+    "FastAPI", "Spring", "HTML", "CSS", "Tailwind", "MongoDB", "MySQL", "PostgreSQL", "Redis",
+    "Kafka", "Spark", "Hadoop", "Go", "Rust", "Kotlin", "Swift", "Flutter", "Dart", "Git",
+    "Linux", "Terraform", "Jenkins", "Pandas", "NumPy", "Scikit-learn", "Keras", "OpenCV",
+    "NLP", "Power BI", "Tableau", "Excel", "MATLAB", "Figma", "GraphQL", "REST", "C#", ".NET",
+    "PHP", "Ruby", "Selenium", "DSA", "OOP", "Data structures", "Algorithms",
+]
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_PATTERN = re.compile(r"(?<!\d)(?:\+?(\d{1,3})[\s-]?)?(\d{5}[\s-]?\d{5}|\d{3}[\s-]?\d{3}[\s-]?\d{4})(?!\d)")
+YEARS_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:years|yrs)", re.IGNORECASE)
+DEFAULT_PHONE_COUNTRY_CODE = os.getenv("DEFAULT_PHONE_COUNTRY_CODE", "91")
+
+# Below this many skills the local result isn't trusted on its own
+FAST_MIN_SKILLS = int(os.getenv("FAST_EXTRACTION_MIN_SKILLS", "5"))
+FAST_EXTRACTION_CONFIDENCE = float(os.getenv("FAST_EXTRACTION_CONFIDENCE", "0.9"))
+# Skill names this short ("C", "R", "Go") also occur as initials and in
+# letter-spaced headings ("P R O F I L E")
+SHORT_SKILL_LENGTH = 2
+
+
+@lru_cache(maxsize=1)
+def skill_vocabulary(roles_path=ROLES_PATH):
+    """
+    {lowercase skill: display name} from the role catalogue plus COMMON_SKILLS.
+    """
+    vocabulary = {}
+    try:
+        for skills in load_role_skills(roles_path):
+            for skill in skills:
+                vocabulary.setdefault(skill.lower(), skill)
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+    for skill in COMMON_SKILLS:
+        vocabulary.setdefault(skill.lower(), skill)
+    return vocabulary
+
+
+@lru_cache(maxsize=1)
+def _skill_patterns(roles_path=ROLES_PATH):
+    patterns = []
+    for key, skill in skill_vocabulary(roles_path).items():
+        # Don't let "C" match inside "C++"/"C#", or "Java" inside "JavaScript"
+        boundary = rf"(?<![\w+#.]){re.escape(skill)}(?![\w+#])"
+        # Very short names ("C", "R", "Go") only count in their exact casing
+        flags = 0 if len(skill) <= SHORT_SKILL_LENGTH else re.IGNORECASE
+        patterns.append((skill, re.compile(boundary, flags)))
+    return patterns
+
+
+def _in_list(text, match):
+    # "Python, C, Dart" or "Languages: C | Go": an item of a comma or | separated list
+    before = text[max(0, match.start() - 10):match.start()].rstrip(" \t")[-1:]
+    after = text[match.end():match.end() + 10].lstrip(" \t")[:1]
+    return before in (",", "|", ":") or after in (",", "|")
+
+
+def _find_skills(text, skills_section):
+    """
+    (listed, possible): skills named in the skills section or in a list, and
+    longer skill names only seen in running text.
+    """
+    listed, possible = [], []
+    for skill, pattern in _skill_patterns():
+        matches = list(pattern.finditer(text))
+        if not matches:
+            continue
+        if pattern.search(skills_section) or any(_in_list(text, match) for match in matches):
+            listed.append(skill)
+        elif len(skill) > SHORT_SKILL_LENGTH:
+            possible.append(skill)
+    return listed, possible
+
+
+def _normalize_phone(country, number):
+    digits = re.sub(r"\D", "", number)
+    return f"+{country or DEFAULT_PHONE_COUNTRY_CODE}-{digits}"
+
+
+def _guess_name(header):
+    for line in header.split("\n")[:5]:
+        words = line.split()
+        # A name is a short line of capitalised words ("Jane Doe", "JANE A. DOE")
+        if 2 <= len(words) <= 4 and all(re.fullmatch(r"[A-Z][A-Za-z'-]*\.?", word) for word in words):
+            return " ".join(word.capitalize() if word.isupper() else word for word in words)
+    return ""
+
+
+def _experience_level(text):
+    years = [float(match) for match in YEARS_PATTERN.findall(text)]
+    if years and max(years) >= 3:
+        return "Experienced"
+    if years and max(years) >= 1:
+        return "Intermediate"
+    return "Fresher"
+
+
+def _section_entries(section, limit=5):
+    return [line for line in section.split("\n") if len(line) > 3][:limit]
+
+
+@timed("pre_extract")
+def pre_extract(text):
+    """
+    Extract resume fields locally. Returns (data, confidence) where data has the
+    same shape as the LLM extraction plus "possible_skills" (skills only seen in
+    running text, too uncertain to keep without the LLM), and confidence is
+    between 0 and 1.
+    """
+    text = compact_text(text)
+    sections = split_sections(text)
+
+    email = EMAIL_PATTERN.search(text)
+    phone = PHONE_PATTERN.search(text)
+    skills, possible_skills = _find_skills(text, sections.get("skills", ""))
+    name = _guess_name(sections.get("header", text))
+
+    data = {
+        "name": name,
+        "email": email.group(0) if email else "",
+        "phone": _normalize_phone(phone.group(1), phone.group(2)) if phone else "",
+        "skills": skills,
+        "experience_level": _experience_level(text),
+        "education": _section_entries(sections.get("education", "")),
+        "projects": _section_entries(sections.get("projects", "")),
+        "possible_skills": possible_skills,
+    }
+    confidence = (
+        0.25 * bool(name)
+        + 0.25 * bool(email)
+        + 0.15 * bool(phone)
+        + 0.35 * min(1.0, len(skills) / FAST_MIN_SKILLS)
+    )
+    return data, round(confidence, 2)
+
+
+def hints_for_prompt(data):
+    """
+    Locally detected fields, formatted for the extraction prompt.
+    """
+    lines = []
+    if data["email"]:
+        lines.append(f"Email: {data['email']}")
+    if data["phone"]:
+        lines.append(f"Phone: {data['phone']}")
+    if data["skills"]:
+        lines.append(f"Skills: {', '.join(data['skills'])}")
+    if data.get("possible_skills"):
+        lines.append(f"Possible skills (only if the resume shows them as skills): {', '.join(data['possible_skills'])}")
+    return "\n".join(lines)
+
+
+def merge_extractions(llm_data, local_data):
+    """
+    Fill gaps in the LLM result from the local one and add the locally listed
+    skills it missed. Possible skills were only hints and are never added.
+    """
+    merged = dict(llm_data)
+    for field in ("name", "email", "phone"):
+        if not merged.get(field) and local_data.get(field):
+            merged[field] = local_data[field]
+    skills = list(merged.get("skills") or [])
+    seen = {skill.lower() for skill in skills}
+    for skill in local_data.get("skills", []):
+        if skill.lower() not in seen:
+            seen.add(skill.lower())
+            skills.append(skill)
+    merged["skills"] = skills
+    return merged
@@ -1,12 +1,16 @@
-from langchain.document_loaders import PyPDFLoader, DirectoryLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.embeddings import HuggingFaceEmbeddings
-import pandas as pd
-from langchain.docstore.document import Document
+import hashlib
+import os
+from functools import lru_cache
+from src.metrics import timed
+
+# langchain, pandas and sentence-transformers are imported inside the functions
+# that need them: importing this module for split_skill_list must stay cheap.
 
 
 #Extract Data From the PDF File
 def load_pdf_file(data):
+    from langchain.document_loaders import PyPDFLoader, DirectoryLoader
+
     loader= DirectoryLoader(data,
                             glob="*.pdf",
                             loader_cls=PyPDFLoader)
@@ -17,32 +21,89 @@ def load_pdf_file(data):
 
 
 
+# Spreadsheet column -> metadata key, matching the role dicts used by the app
+ROLE_COLUMNS = {
+    'Company': 'company',
+    'Roles': 'role',
+    'Responsibilities': 'responsibilities',
+    'Language': 'language',
+    'Essential Knowledge': 'knowledge',
+    'Experience Required': 'experience',
+    'Level of Role': 'level',
+    'Package Details (LPA)': 'package',
+}
+
+# Bump when the document layout or metadata changes so every row is re-indexed
+ROLE_DOC_VERSION = "2"
+
+ROLES_PATH = os.getenv("ROLES_PATH", "Data/company roles.xlsx")
+# Columns listing the skills a role asks for
+SKILL_COLUMNS = ['Language', 'Essential Knowledge']
+
+
 #Load Data From Excel File
+@timed("load_excel")
 def load_excel_file(file_path):
-    df = pd.read_excel(file_path)
+    import pandas as pd
+    from langchain.docstore.document import Document
+
+    # One Document per role: rows are short enough to embed whole, so they are
+    # never split across vectors and every column is kept as metadata
+    df = pd.read_excel(file_path).fillna("")
     documents = []
     
     for _, row in df.iterrows():
         # Create a text representation of each row
         text = f"Company: {row['Company']}\nRole: {row['Roles']}\nResponsibilities: {row['Responsibilities']}\nLanguage: {row['Language']}\nEssential Knowledge: {row['Essential Knowledge']}\nExperience Required: {row['Experience Required']}\nLevel of Role: {row['Level of Role']}\nPackage Details: {row['Package Details (LPA)']}"
-        
+
+        metadata = {key: str(row[column]).strip() for column, key in ROLE_COLUMNS.items()}
+        # Stable id per (company, role) and a hash of the row contents,
+        # used by the incremental indexer to detect changed rows
+        metadata['row_id'] = hashlib.sha256(f"{row['Company']}|{row['Roles']}".strip().lower().encode()).hexdigest()[:16]
+        metadata['row_hash'] = hashlib.sha256(f"{ROLE_DOC_VERSION}\n{text}".encode()).hexdigest()
+
         # Create a Document object with metadata
-        doc = Document(
-            page_content=text,
-            metadata={
-                'company': row['Company'],
-                'role': row['Roles'],
-                'package': row['Package Details (LPA)']
-            }
-        )
+        doc = Document(page_content=text, metadata=metadata)
         documents.append(doc)
     
     return documents
 
 
 
+#Split a "Language" / "Essential Knowledge" cell into individual skills
+def split_skill_list(value):
+    skills = []
+    for part in str(value).split(','):
+        part = part.strip()
+        # "AWS/GCP/Azure" lists alternatives, but "CI/CD pipelines" is one skill
+        if '/' in part and ' ' not in part:
+            skills.extend(p.strip() for p in part.split('/') if p.strip())
+        elif part:
+            skills.append(part)
+    return skills
+
+
+
+#Skills of every role in the spreadsheet, read once per process
+@lru_cache(maxsize=1)
+def load_role_skills(roles_path=ROLES_PATH):
+    """
+    One tuple of skill names per spreadsheet row. Raises FileNotFoundError,
+    KeyError or ValueError when the spreadsheet is missing or malformed.
+    """
+    import pandas as pd
+
+    df = pd.read_excel(roles_path).fillna("")
+    return tuple(
+        tuple(skill for column in SKILL_COLUMNS for skill in split_skill_list(row[column]))
+        for _, row in df.iterrows()
+    )
+
+
 #Split the Data into Text Chunks
 def text_split(extracted_data):
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
     text_splitter=RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=20)
     text_chunks=text_splitter.split_documents(extracted_data)
     return text_chunks
@@ -50,6 +111,9 @@ def text_split(extracted_data):
 
 
 #Download the Embeddings from HuggingFace 
+@timed("embedding_model_load")
 def download_hugging_face_embeddings():
+    from langchain.embeddings import HuggingFaceEmbeddings
+
     embeddings=HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2')  #this model return 384 dimensions
     return embeddings
\ No newline at end of file
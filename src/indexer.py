@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from langchain.docstore.document import Document
+from src.local_index import LOCAL_INDEX_DIR, LocalVectorStore, write_local_index
+
+
+# Incremental indexing of the company roles spreadsheet.
+# Every row carries a stable row_id and a row_hash (see load_excel_file). A local
+# manifest remembers which hash and vector ids were indexed per row, so a run
+# only embeds and upserts new or changed rows and deletes the vectors of rows
+# that disappeared from the spreadsheet.
+
+MANIFEST_DIR = os.getenv("INDEX_MANIFEST_DIR", "Data/index_manifests")
+EMBED_BATCH_SIZE = int(os.getenv("INDEX_EMBED_BATCH_SIZE", "64"))
+UPSERT_BATCH_SIZE = int(os.getenv("INDEX_UPSERT_BATCH_SIZE", "100"))
+INDEX_MAX_WORKERS = int(os.getenv("INDEX_MAX_WORKERS", "4"))
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _clean_metadata(metadata):
+    # Pinecone only accepts strings, numbers, booleans and lists of strings
+    clean = {}
+    for key, value in metadata.items():
+        if isinstance(value, (str, bool, int, float)) and not isinstance(value, np.generic):
+            clean[key] = value
+        elif isinstance(value, np.generic):
+            clean[key] = value.item()
+        else:
+            clean[key] = str(value)
+    return clean
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {"rows": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(path, manifest):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def plan_changes(documents, manifest):
+    """
+    Group chunk documents by row and compare them with the manifest.
+    Returns (rows to (re)index as {row_id: (row_hash, [chunks])}, vector ids to delete).
+    """
+    grouped = {}
+    for doc in documents:
+        grouped.setdefault(doc.metadata["row_id"], []).append(doc)
+    # Spreadsheet rows with the same company and role share a row_id, so the
+    # stored hash covers every document of the id, not just the first one
+    rows = {}
+    for row_id, docs in grouped.items():
+        row_hash = docs[0].metadata["row_hash"] if len(docs) == 1 else hashlib.sha256(
+            "\n".join(doc.metadata["row_hash"] for doc in docs).encode()
+        ).hexdigest()
+        rows[row_id] = (row_hash, docs)
+
+    indexed = manifest.get("rows", {})
+    changed = {row_id: row for row_id, row in rows.items() if indexed.get(row_id, {}).get("hash") != row[0]}
+    stale_ids = []
+    for row_id, entry in indexed.items():
+        # Vectors of removed rows, and old vectors of changed rows
+        if row_id not in rows or row_id in changed:
+            stale_ids.extend(entry["ids"])
+    return changed, stale_ids
+
+
+def embed_in_batches(embedding, texts, batch_size=EMBED_BATCH_SIZE):
+    vectors = []
+    for batch in _batches(texts, batch_size):
+        vectors.extend(embedding.embed_documents(batch))
+    return vectors
+
+
+class PineconeTarget:
+    def __init__(self, index, index_name, max_workers=INDEX_MAX_WORKERS):
+        self.index = index
+        self.manifest_path = os.path.join(MANIFEST_DIR, f"{index_name}.json")
+        self.max_workers = max_workers
+
+    def _run_batches(self, fn, items):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # list() so any failed batch raises here
+            list(executor.map(fn, list(_batches(items, UPSERT_BATCH_SIZE))))
+
+    def delete(self, ids):
+        self._run_batches(lambda batch: self.index.delete(ids=batch), ids)
+
+    def delete_all(self):
+        # A new serverless index has no namespace yet, and deleting from it fails with a 404
+        if self.index.describe_index_stats().total_vector_count == 0:
+            return
+        try:
+            self.index.delete(delete_all=True)
+        except Exception as e:
+            if getattr(e, "status", None) != 404:
+                raise
+
+    def upsert(self, ids, vectors, documents):
+        # "text" is the key PineconeVectorStore reads page_content from
+        items = [
+            {"id": id_, "values": list(map(float, vector)), "metadata": {**_clean_metadata(doc.metadata), "text": doc.page_content}}
+            for id_, vector, doc in zip(ids, vectors, documents)
+        ]
+        self._run_batches(lambda batch: self.index.upsert(vectors=batch), items)
+
+
+class LocalTarget:
+    def __init__(self, index_dir=LOCAL_INDEX_DIR):
+        self.index_dir = index_dir
+        self.manifest_path = os.path.join(index_dir, "manifest.json")
+
+    def _load(self):
+        try:
+            store = LocalVectorStore(None, self.index_dir)
+        except FileNotFoundError:
+            return {}
+        # Copy out of the memory map, this version is removed once the next one is published
+        vectors = np.array(store.vectors)
+        return {
+            record["id"]: (vector, Document(page_content=record["page_content"], metadata=record["metadata"]))
+            for record, vector in zip(store.records(), vectors)
+            if "id" in record
+        }
+
+    def _write(self, entries):
+        ids = list(entries)
+        write_local_index(ids, [entries[id_][0] for id_ in ids], [entries[id_][1] for id_ in ids], self.index_dir)
+
+    def delete(self, ids):
+        ids = set(ids)
+        self._write({id_: entry for id_, entry in self._load().items() if id_ not in ids})
+
+    def delete_all(self):
+        self._write({})
+
+    def upsert(self, ids, vectors, documents):
+        # The matrix is small enough to rewrite; only new rows were embedded
+        entries = self._load()
+        for id_, vector, doc in zip(ids, vectors, documents):
+            entries[id_] = (np.asarray(vector, dtype=np.float32), doc)
+        self._write(entries)
+
+
+def sync_index(documents, embedding, target, rebuild=False):
+    """
+    Bring target in line with documents, embedding only new or changed rows.
+    Returns a summary of what was done.
+    """
+    # Without a manifest we can't know what is already indexed (e.g. vectors from
+    # an older full upload), so start from an empty index
+    rebuild = rebuild or not os.path.exists(target.manifest_path)
+    manifest = {"rows": {}} if rebuild else load_manifest(target.manifest_path)
+    if rebuild:
+        target.delete_all()
+
+    changed, stale_ids = plan_changes(documents, manifest)
+
+    ids, chunks = [], []
+    for row_id, (_, row_chunks) in changed.items():
+        for n, doc in enumerate(row_chunks):
+            ids.append(f"{row_id}-{n}")
+            chunks.append(doc)
+
+    if stale_ids:
+        target.delete(stale_ids)
+    vectors = embed_in_batches(embedding, [doc.page_content for doc in chunks])
+    if ids:
+        target.upsert(ids, vectors, chunks)
+
+    row_ids = {doc.metadata["row_id"] for doc in documents}
+    rows = {row_id: entry for row_id, entry in manifest.get("rows", {}).items() if row_id in row_ids}
+    for row_id, (row_hash, row_chunks) in changed.items():
+        rows[row_id] = {"hash": row_hash, "ids": [f"{row_id}-{n}" for n in range(len(row_chunks))]}
+    save_manifest(target.manifest_path, {"rows": rows})
+
+    return {
+        "rows": len(row_ids),
+        "changed_rows": len(changed),
+        "embedded_vectors": len(ids),
+        "deleted_vectors": len(stale_ids),
+    }
@@ -0,0 +1,119 @@
+import io
+import os
+import re
+from collections import namedtuple
+from pypdf import PdfReader
+from src.metrics import timed
+
+
+# Resume ingestion: parse an uploaded PDF once, from memory, and turn its text
+# into a prompt-sized extract that keeps the sections the analysis needs.
+
+MAX_PDF_BYTES = int(os.getenv("MAX_PDF_BYTES", str(10 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "20"))
+# Rough prompt budget for resume content; ~4 characters per token
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "2500"))
+CHARS_PER_TOKEN = 4
+
+ParsedResume = namedtuple("ParsedResume", ["text", "page_count"])
+
+# Section name -> heading words that start it, in prompt priority order
+SECTION_HEADINGS = {
+    "skills": ["skills", "technical skills", "core competencies", "technologies", "tech stack", "tools"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "internships", "internship"],
+    "projects": ["projects", "academic projects", "personal projects", "key projects"],
+    "education": ["education", "academic background", "qualifications"],
+    "certifications": ["certifications", "certificates", "courses", "achievements", "awards"],
+    "summary": ["summary", "profile", "objective", "about me", "career objective"],
+}
+
+_HEADING_PATTERN = re.compile(
+    r"^\s*(%s)\s*:?\s*$" % "|".join(
+        re.escape(word) for words in SECTION_HEADINGS.values() for word in sorted(words, key=len, reverse=True)
+    ),
+    re.IGNORECASE
+)
+_HEADING_TO_SECTION = {word: name for name, words in SECTION_HEADINGS.items() for word in words}
+# Letter-spaced headings ("T E C H N I C A L S K I L L S") lose their word breaks
+_SPACED_HEADING_TO_SECTION = {word.replace(" ", ""): name for word, name in _HEADING_TO_SECTION.items()}
+_SPACED_LETTERS_PATTERN = re.compile(r"^(?:[A-Za-z] )+[A-Za-z]$")
+
+
+@timed("pdf_parse")
+def ingest_pdf(data, max_bytes=MAX_PDF_BYTES, max_pages=MAX_PDF_PAGES):
+    """
+    Parse PDF bytes once and return ParsedResume(text, page_count).
+    Raises ValueError when the file is over the size or page limit.
+    """
+    if len(data) > max_bytes:
+        raise ValueError(f"PDF is {len(data) / 1024 / 1024:.1f} MB, the limit is {max_bytes / 1024 / 1024:.0f} MB")
+    reader = PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+    if page_count > max_pages:
+        raise ValueError(f"PDF has {page_count} pages, the limit is {max_pages}")
+
+    # Sequential on purpose: forking the threaded app or service process for at
+    # most MAX_PDF_PAGES pages risks deadlocks and costs more than it saves.
+    # batch_process.py parallelises across files instead
+    pages = [page.extract_text() or "" for page in reader.pages]
+
+    return ParsedResume("\n".join(pages), page_count)
+
+
+def split_sections(text):
+    """
+    Split resume text into {section name: text}. Text before the first heading
+    (usually name and contact details) goes under "header".
+    """
+    sections = {"header": []}
+    current = "header"
+    for line in text.split("\n"):
+        section = None
+        match = _HEADING_PATTERN.match(line) if len(line) < 40 else None
+        if match:
+            section = _HEADING_TO_SECTION[match.group(1).lower()]
+        elif len(line) < 80 and _SPACED_LETTERS_PATTERN.match(line.strip()):
+            section = _SPACED_HEADING_TO_SECTION.get(line.replace(" ", "").lower())
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items() if "\n".join(lines).strip()}
+
+
+def compact_text(text):
+    # PDF extraction leaves runs of spaces and whitespace-only lines that only cost tokens
+    lines = (re.sub(r"[ \t\u00a0]+", " ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def budget_resume_text(text, token_budget=RESUME_TOKEN_BUDGET):
+    """
+    Build the resume part of the extraction prompt within token_budget.
+    Sections are added in priority order (contact header, skills, experience,
+    projects, education, ...) and the last one that fits only partly is cut,
+    so a long resume loses its least useful content instead of its tail.
+    """
+    budget = token_budget * CHARS_PER_TOKEN
+    text = compact_text(text)
+    if len(text) <= budget:
+        return text
+
+    sections = split_sections(text)
+    if len(sections) <= 1:
+        # No headings detected, fall back to the beginning of the document
+        return text[:budget]
+
+    order = ["header"] + list(SECTION_HEADINGS)
+    parts = []
+    remaining = budget
+    for name in order:
+        if name not in sections or remaining <= 0:
+            continue
+        block = f"{name.upper()}:\n{sections[name]}\n"
+        # Contact details sit at the top of the header; don't let it crowd out the rest
+        limit = min(remaining, budget // 4) if name == "header" else remaining
+        parts.append(block[:limit])
+        remaining -= len(parts[-1])
+    return "\n".join(parts)
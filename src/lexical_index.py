@@ -0,0 +1,152 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from langchain.docstore.document import Document
+from src.helper import split_skill_list
+
+
+# Keyword side of role retrieval: a BM25 inverted index over the role fields,
+# built by store_index.py next to the dense index. HybridRetriever fuses its
+# ranking with the dense one by reciprocal rank fusion (RRF), so exact tech
+# terms ("Kafka", "Go") count even when the embedding blurs them, and can
+# rerank the fused candidates by how many of the role's skills the user has.
+
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "Data/role_lexical.json")
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Standard RRF damping constant
+RRF_K = 60
+# Candidates taken from each ranking before fusion, per result returned
+CANDIDATE_FACTOR = int(os.getenv("HYBRID_CANDIDATE_FACTOR", "4"))
+HYBRID_RERANK = os.getenv("HYBRID_RERANK", "1") == "1"
+RERANK_WEIGHT = float(os.getenv("HYBRID_RERANK_WEIGHT", "0.02"))
+
+# Skill fields are repeated so a keyword there outweighs one in a responsibility line
+FIELD_WEIGHTS = {"role": 1, "language": 2, "knowledge": 2, "responsibilities": 1, "company": 1}
+STOPWORDS = {"and", "or", "the", "of", "for", "to", "in", "with", "a", "an", "on"}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def tokenize(text):
+    # Keeps "c++", "c#" and "node.js" whole; "ci/cd" becomes "ci", "cd"
+    tokens = (token.rstrip(".") for token in _TOKEN_PATTERN.findall(str(text).lower()))
+    return [token for token in tokens if token and token not in STOPWORDS]
+
+
+def _role_key(doc):
+    metadata = doc.metadata or {}
+    return metadata.get("row_id") or doc.page_content
+
+
+def write_lexical_index(documents, path=LEXICAL_INDEX_PATH):
+    """
+    Build the BM25 index over the role documents and write it to path.
+    """
+    postings = {}
+    lengths = []
+    records = []
+    for position, doc in enumerate(documents):
+        metadata = doc.metadata or {}
+        tokens = []
+        for field, weight in FIELD_WEIGHTS.items():
+            tokens += tokenize(metadata.get(field, "")) * weight
+        if not tokens:
+            tokens = tokenize(doc.page_content)
+        for token, count in Counter(tokens).items():
+            postings.setdefault(token, []).append([position, count])
+        lengths.append(len(tokens))
+        records.append({"id": _role_key(doc), "page_content": doc.page_content, "metadata": metadata})
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"postings": postings, "lengths": lengths, "records": records}, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+class LexicalIndex:
+    def __init__(self, path=LEXICAL_INDEX_PATH):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.postings = data["postings"]
+        self.lengths = data["lengths"]
+        self.records = data["records"]
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 1.0
+        count = len(self.lengths)
+        self.idf = {
+            token: math.log(1 + (count - len(entries) + 0.5) / (len(entries) + 0.5))
+            for token, entries in self.postings.items()
+        }
+
+    def search(self, query, k):
+        """
+        Return [(record position, BM25 score)] of the k best records, best first.
+        """
+        scores = {}
+        for token in set(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for position, count in self.postings[token]:
+                norm = count + BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[position] / self.average_length)
+                scores[position] = scores.get(position, 0.0) + idf * count * (BM25_K1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    def document(self, position):
+        record = self.records[position]
+        return Document(page_content=record["page_content"], metadata=record["metadata"])
+
+
+def skill_coverage(query, doc):
+    """
+    Share of the role's listed skills that appear in the comma-separated query.
+    """
+    metadata = doc.metadata or {}
+    role_skills = {skill.lower() for field in ("language", "knowledge") for skill in split_skill_list(metadata.get(field, ""))}
+    if not role_skills:
+        return 0.0
+    user_skills = {skill.strip().lower() for skill in query.split(",") if skill.strip()}
+    return len(role_skills & user_skills) / len(role_skills)
+
+
+class HybridRetriever:
+    """
+    Same interface as the dense retrievers: dense and BM25 candidates, fused by RRF,
+    optionally reranked by skill coverage.
+    """
+
+    def __init__(self, vectorstore, lexical_index, k, rerank=HYBRID_RERANK):
+        self.k = k
+        self.candidates = max(k * CANDIDATE_FACTOR, k)
+        self.dense = vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": self.candidates})
+        self.lexical = lexical_index
+        self.rerank = rerank
+
+    def get_relevant_documents(self, query):
+        fused = {}
+        docs = {}
+        for rank, doc in enumerate(self.dense.get_relevant_documents(query)):
+            key = _role_key(doc)
+            docs.setdefault(key, doc)
+            fused[key] = fused.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+        for rank, (position, _) in enumerate(self.lexical.search(query, self.candidates)):
+            key = self.lexical.records[position]["id"]
+            if key not in docs:
+                docs[key] = self.lexical.document(position)
+            fused[key] = fused.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        if self.rerank:
+            # Coverage is in [0, 1]; the weight keeps it comparable to RRF scores (<= 2/61)
+            for key in fused:
+                fused[key] += RERANK_WEIGHT * skill_coverage(query, docs[key])
+        ranked = sorted(fused, key=lambda key: -fused[key])
+        return [docs[key] for key in ranked[:self.k]]
+
+    def invoke(self, query, **kwargs):
+        return self.get_relevant_documents(query)
@@ -0,0 +1,240 @@
+import hashlib
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from src.metrics import count, current_stage, get_registry, record_llm_usage, timed
+
+
+# Process-wide Gemini client wrapper. Every call made by the app, the batch CLI
+# and the service goes through one instance, which
+#   - caps calls in flight, handing free slots out by priority (extraction first, to-dos last),
+#   - paces calls with token buckets for requests and tokens per minute,
+#   - retries rate limit and transient errors with jittered exponential backoff,
+#   - coalesces identical concurrent prompts into one call (singleflight).
+# Under the quota ceiling requests queue up instead of failing.
+
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "1000"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+# Completion size assumed when reserving tokens; corrected once usage is known
+EXPECTED_OUTPUT_TOKENS = 500
+CHARS_PER_TOKEN = 4
+
+# Lower runs first. Stages not listed get DEFAULT_PRIORITY.
+STAGE_PRIORITY = {"extract": 0, "skills": 1, "courses": 1, "todo": 2, "todo_batch": 2, "todo_stream": 2}
+DEFAULT_PRIORITY = 1
+
+_RETRYABLE_MARKERS = ("429", "rate limit", "resource exhausted", "resourceexhausted", "quota",
+                      "503", "unavailable", "deadline", "timeout", "timed out", "500 internal")
+
+
+def is_retryable(error):
+    text = f"{type(error).__name__} {error}".lower()
+    return isinstance(error, (TimeoutError, ConnectionError)) or any(marker in text for marker in _RETRYABLE_MARKERS)
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute up to one minute's worth. take() blocks until
+    the amount is available; the balance may go negative to settle underestimates.
+    """
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.available = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount):
+        if self.rate <= 0:
+            return 0.0
+        # A single request bigger than the bucket would wait forever
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return waited
+                delay = (amount - self.available) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def settle(self, amount):
+        # Positive amounts are charged, negative ones refunded
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self.available = min(self.capacity, self.available - amount)
+
+
+class PriorityGate:
+    """
+    At most `limit` holders; when a slot frees up the lowest priority number waiting gets it.
+    """
+
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        self._waiting = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+
+    def acquire(self, priority):
+        with self._condition:
+            entry = (priority, next(self._order))
+            heapq.heappush(self._waiting, entry)
+            while self.in_flight >= self.limit or self._waiting[0] != entry:
+                self._condition.wait()
+            heapq.heappop(self._waiting)
+            self.in_flight += 1
+            # The next waiter may fit too
+            self._condition.notify_all()
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def set_limit(self, limit):
+        with self._condition:
+            self.limit = max(1, limit)
+            self._condition.notify_all()
+
+
+def _prompt_text(args, kwargs):
+    prompt = args[0] if args else kwargs.get("input", "")
+    return prompt if isinstance(prompt, str) else repr(prompt)
+
+
+class LimitedLLM:
+    """
+    Wraps the chat model with the concurrency cap, rate limits, retries and coalescing described above.
+    """
+
+    def __init__(self, llm, limit, requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=LLM_TOKENS_PER_MINUTE, max_retries=LLM_MAX_RETRIES):
+        self.llm = llm
+        self.max_retries = max_retries
+        self.limit = limit
+        self._gate = PriorityGate(limit)
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    def set_limit(self, limit):
+        self.limit = limit
+        self._gate.set_limit(limit)
+
+    def _acquire(self, priority, prompt_tokens):
+        # Time spent waiting for a slot and for quota shows whether the caps are the bottleneck
+        start = time.perf_counter()
+        self._gate.acquire(priority)
+        get_registry().observe("llm_queue_wait", time.perf_counter() - start)
+        throttled = self._requests.take(1) + self._tokens.take(prompt_tokens + EXPECTED_OUTPUT_TOKENS)
+        if throttled:
+            get_registry().observe("llm_rate_limit_wait", throttled)
+
+    def _settle_tokens(self, response, prompt_tokens):
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage:
+            actual = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+            self._tokens.settle(actual - prompt_tokens - EXPECTED_OUTPUT_TOKENS)
+
+    def _backoff(self, attempt, error, stage):
+        # Full jitter: a random delay up to the exponential cap spreads retries out
+        delay = random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** attempt))
+        count("llm_retries", stage=stage, error=type(error).__name__)
+        time.sleep(delay)
+
+    def _call(self, stage, priority, args, kwargs):
+        prompt_tokens = len(_prompt_text(args, kwargs)) // CHARS_PER_TOKEN
+        for attempt in range(self.max_retries + 1):
+            self._acquire(priority, prompt_tokens)
+            try:
+                with timed(f"llm.{stage}"):
+                    response = self.llm.invoke(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                error = e
+            else:
+                self._settle_tokens(response, prompt_tokens)
+                record_llm_usage(response, stage)
+                return response
+            finally:
+                self._gate.release()
+            # The slot is given back while backing off
+            self._backoff(attempt, error, stage)
+
+    def invoke(self, *args, priority=None, **kwargs):
+        stage = current_stage()
+        priority = STAGE_PRIORITY.get(stage, DEFAULT_PRIORITY) if priority is None else priority
+
+        # Singleflight: identical prompts in flight at the same time share one call
+        key = hashlib.sha256(f"{_prompt_text(args, kwargs)}\n{sorted(kwargs.items())!r}".encode("utf-8")).hexdigest()
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            count("llm_coalesced", stage=stage)
+            return future.result()
+
+        try:
+            future.set_result(self._call(stage, priority, args, kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+        return future.result()
+
+    def stream(self, *args, metrics_stage=None, priority=None, **kwargs):
+        # Generators run outside the caller's timed() block, so the stage can be passed in
+        stage = metrics_stage or current_stage()
+        priority = STAGE_PRIORITY.get(stage, DEFAULT_PRIORITY) if priority is None else priority
+        prompt_tokens = len(_prompt_text(args, kwargs)) // CHARS_PER_TOKEN
+        for attempt in range(self.max_retries + 1):
+            # The slot is held until the whole response has been streamed
+            self._acquire(priority, prompt_tokens)
+            start = time.perf_counter()
+            usage = None
+            started = False
+            try:
+                for chunk in self.llm.stream(*args, **kwargs):
+                    # Usage arrives with the final chunk(s)
+                    usage = chunk if getattr(chunk, "usage_metadata", None) else usage
+                    started = True
+                    yield chunk
+                self._settle_tokens(usage, prompt_tokens)
+                record_llm_usage(usage, stage)
+                return
+            except Exception as e:
+                # Once text has been shown a retry would repeat it, so only retry before the first chunk
+                if started or attempt == self.max_retries or not is_retryable(e):
+                    raise
+                error = e
+            finally:
+                self._gate.release()
+                get_registry().observe(f"llm.{stage}", time.perf_counter() - start)
+            self._backoff(attempt, error, stage)
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
@@ -0,0 +1,212 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+import numpy as np
+from langchain.docstore.document import Document
+
+
+# In-process vector index for the company roles catalogue.
+# Embeddings are stored L2-normalised as a float32 .npy matrix, so cosine
+# similarity is a matrix-vector product. Each row's text and metadata live in a
+# SQLite file next to it and only the rows a query returns are read. For large
+# catalogues a compact copy (int8 with one scale per vector, or float16) is
+# written too: queries scan the compact matrix, then rescore a shortlist against
+# the exact float32 rows. All matrices are memory-mapped, so workers on one
+# machine share the pages and only the compact matrix plus the shortlisted rows
+# need to be resident. Each write goes to a new version directory and CURRENT is
+# switched to it last, so workers that still map the previous files are never
+# truncated under and new readers never pair new vectors with old records.
+
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "Data/role_index")
+VECTORS_FILE = "vectors.npy"
+QUANTIZED_FILE = "vectors_quantized.npy"
+SCALES_FILE = "scales.npy"
+RECORDS_FILE = "records.sqlite3"
+# Names the version directory readers open; indexes written before it have their files in index_dir itself
+CURRENT_FILE = "CURRENT"
+# Sidecar of indexes written before RECORDS_FILE, loaded whole into memory
+METADATA_FILE = "metadata.json"
+# "int8", "float16" or "float32" (no compact copy)
+LOCAL_INDEX_DTYPE = os.getenv("LOCAL_INDEX_DTYPE", "int8")
+# Shortlist size for exact rescoring, per result requested
+RESCORE_FACTOR = int(os.getenv("LOCAL_INDEX_RESCORE_FACTOR", "10"))
+MIN_SHORTLIST = 50
+# Rows upcast and scored per block: small enough to stay in CPU cache and to
+# never materialise a float32 copy of the compact matrix
+SCAN_BLOCK_ROWS = 8192
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize(vectors, dtype=LOCAL_INDEX_DTYPE):
+    """
+    Compact copy of normalised vectors: (matrix, per-vector scales) so that row * scale ~ vector.
+    """
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127 if len(vectors) else np.zeros(0, dtype=np.float32)
+        scales[scales == 0] = 1.0
+        return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+    return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+
+
+def current_index_dir(index_dir=LOCAL_INDEX_DIR):
+    """
+    Directory holding the files of the index currently published in index_dir.
+    """
+    try:
+        with open(os.path.join(index_dir, CURRENT_FILE), encoding="utf-8") as f:
+            return os.path.join(index_dir, f.read().strip())
+    except FileNotFoundError:
+        return index_dir
+
+
+def write_local_index(ids, vectors, documents, index_dir=LOCAL_INDEX_DIR, dtype=LOCAL_INDEX_DTYPE):
+    """
+    Write already-computed vectors and their documents as a new version of index_dir.
+    """
+    version = f"v-{uuid.uuid4().hex[:12]}"
+    version_dir = os.path.join(index_dir, version)
+    os.makedirs(version_dir)
+    vectors = _normalize(vectors) if len(ids) else np.zeros((0, 1), dtype=np.float32)
+    np.save(os.path.join(version_dir, VECTORS_FILE), vectors)
+    if dtype != "float32":
+        compact, scales = quantize(vectors, dtype)
+        np.save(os.path.join(version_dir, QUANTIZED_FILE), compact)
+        np.save(os.path.join(version_dir, SCALES_FILE), scales)
+
+    conn = sqlite3.connect(os.path.join(version_dir, RECORDS_FILE))
+    conn.execute("CREATE TABLE records (row INTEGER PRIMARY KEY, id TEXT, page_content TEXT NOT NULL, metadata TEXT NOT NULL)")
+    conn.executemany(
+        "INSERT INTO records (row, id, page_content, metadata) VALUES (?, ?, ?, ?)",
+        ((row, id_, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False, default=str)) for row, (id_, doc) in enumerate(zip(ids, documents)))
+    )
+    conn.commit()
+    conn.close()
+
+    # Publish: one atomic rename switches readers to the complete new version
+    tmp_path = os.path.join(index_dir, f"{CURRENT_FILE}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(index_dir, CURRENT_FILE))
+
+    # Older versions and the pre-versioning files. Unlinking doesn't disturb
+    # workers that still have them mapped or open; they keep the old pages
+    for name in os.listdir(index_dir):
+        path = os.path.join(index_dir, name)
+        if name.startswith("v-") and name != version and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif name in (VECTORS_FILE, QUANTIZED_FILE, SCALES_FILE, RECORDS_FILE, METADATA_FILE):
+            os.remove(path)
+
+
+class LocalRetriever:
+    def __init__(self, store, k):
+        self.store = store
+        self.k = k
+
+    def get_relevant_documents(self, query):
+        return self.store.similarity_search(query, k=self.k)
+
+    def invoke(self, query, **kwargs):
+        return self.get_relevant_documents(query)
+
+
+class LocalVectorStore:
+    """
+    Drop-in replacement for PineconeVectorStore's search and retriever API, backed by local files.
+    """
+
+    def __init__(self, embedding, index_dir=LOCAL_INDEX_DIR):
+        self.embedding = embedding
+        self.index_dir = index_dir
+        # Resolved once: every file below comes from the same version
+        files_dir = current_index_dir(index_dir)
+        self.vectors = np.load(os.path.join(files_dir, VECTORS_FILE), mmap_mode="r")
+        # Indexes written before quantization, or with LOCAL_INDEX_DTYPE=float32, have no compact copy
+        self.compact = self.scales = None
+        if os.path.exists(os.path.join(files_dir, QUANTIZED_FILE)):
+            self.compact = np.load(os.path.join(files_dir, QUANTIZED_FILE), mmap_mode="r")
+            self.scales = np.load(os.path.join(files_dir, SCALES_FILE), mmap_mode="r")
+        self._conn = self._legacy_records = None
+        self._lock = threading.Lock()
+        records_path = os.path.join(files_dir, RECORDS_FILE)
+        if os.path.exists(records_path):
+            self._conn = sqlite3.connect(f"file:{records_path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            with open(os.path.join(files_dir, METADATA_FILE), encoding="utf-8") as f:
+                self._legacy_records = json.load(f)
+
+    def records(self, rows=None):
+        """
+        {"id", "page_content", "metadata"} of the given row numbers, in order (all rows by default).
+        """
+        if self._legacy_records is not None:
+            return list(self._legacy_records) if rows is None else [self._legacy_records[row] for row in rows]
+        if rows is not None and not len(rows):
+            return []
+        with self._lock:
+            if rows is None:
+                found = self._conn.execute("SELECT row, id, page_content, metadata FROM records ORDER BY row").fetchall()
+            else:
+                rows = [int(row) for row in rows]
+                found = self._conn.execute(
+                    f"SELECT row, id, page_content, metadata FROM records WHERE row IN ({', '.join('?' * len(rows))})", rows
+                ).fetchall()
+        by_row = {row: {"id": id_, "page_content": page_content, "metadata": json.loads(metadata)} for row, id_, page_content, metadata in found}
+        return [by_row[row] for row in (rows if rows is not None else sorted(by_row))]
+
+    def _approximate_scores(self, query):
+        scores = np.empty(len(self.compact), dtype=np.float32)
+        # One float32 buffer per call, reused for every block
+        buffer = np.empty((min(SCAN_BLOCK_ROWS, len(self.compact)), self.compact.shape[1]), dtype=np.float32)
+        for start in range(0, len(self.compact), SCAN_BLOCK_ROWS):
+            block = self.compact[start:start + SCAN_BLOCK_ROWS]
+            upcast = buffer[:len(block)]
+            np.copyto(upcast, block)
+            scores[start:start + len(block)] = upcast @ query
+        return scores * self.scales
+
+    def search_vector(self, query_vector, k):
+        """
+        Return (row indices, cosine scores) of the k best rows, best first.
+        """
+        query = _normalize(query_vector)
+        k = min(k, len(self.vectors))
+        if k <= 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        shortlist_size = max(k * RESCORE_FACTOR, MIN_SHORTLIST)
+        if self.compact is None or shortlist_size >= len(self.vectors):
+            # Small catalogue: exact scores for every row are as cheap as the compact scan
+            candidates = np.arange(len(self.vectors))
+            scores = self.vectors @ query
+        else:
+            approximate = self._approximate_scores(query)
+            candidates = np.sort(np.argpartition(-approximate, shortlist_size - 1)[:shortlist_size])
+            # Exact rescoring only reads the shortlisted rows of the float32 matrix
+            scores = self.vectors[candidates] @ query
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return candidates[top], scores[top]
+
+    def similarity_search_with_score(self, query, k=4):
+        rows, scores = self.search_vector(self.embedding.embed_query(query), k)
+        return [
+            (Document(page_content=record["page_content"], metadata=record["metadata"]), float(score))
+            for record, score in zip(self.records(rows), scores)
+        ]
+
+    def similarity_search(self, query, k=4):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def as_retriever(self, search_type="similarity", search_kwargs=None):
+        return LocalRetriever(self, (search_kwargs or {}).get("k", 4))
@@ -0,0 +1,151 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# In-process instrumentation for the analysis hot path.
+# timed() measures a stage and writes one structured JSON log line per call;
+# count() bumps a counter. Everything lands in one registry that can be read
+# with snapshot() (sidebar debug panel, batch CLI) or prometheus_text() (scraping).
+
+METRICS_LOG = os.getenv("METRICS_LOG", "1") == "1"
+# Recent durations kept per stage for percentiles
+SAMPLE_SIZE = int(os.getenv("METRICS_SAMPLE_SIZE", "512"))
+
+logger = logging.getLogger("resume_analyzer.metrics")
+if METRICS_LOG and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Stage whose timed() block is running in this thread; LLM token usage is booked to it
+_current_stage = contextvars.ContextVar("current_stage", default="unknown")
+
+
+def _label_key(name, labels):
+    return (name, tuple(sorted((key, str(value)) for key, value in labels.items())))
+
+
+class MetricsRegistry:
+    def __init__(self, sample_size=SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timers = {}
+
+    def count(self, name, value=1, **labels):
+        key = _label_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            timer = self._timers.get(stage)
+            if timer is None:
+                timer = self._timers[stage] = {"count": 0, "total": 0.0, "max": 0.0, "samples": deque(maxlen=self.sample_size)}
+            timer["count"] += 1
+            timer["total"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+            timer["samples"].append(seconds)
+
+    def snapshot(self):
+        """
+        {"stages": {stage: count/mean/p50/p95/max in ms}, "counters": {"name{labels}": value}}
+        """
+        with self._lock:
+            stages = {}
+            for stage, timer in self._timers.items():
+                samples = sorted(timer["samples"])
+                stages[stage] = {
+                    "count": timer["count"],
+                    "mean_ms": round(1000 * timer["total"] / timer["count"], 2),
+                    "p50_ms": round(1000 * samples[len(samples) // 2], 2),
+                    "p95_ms": round(1000 * samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+                    "max_ms": round(1000 * timer["max"], 2),
+                }
+            counters = {_format_name(name, labels): value for (name, labels), value in self._counters.items()}
+        return {"stages": stages, "counters": counters}
+
+    def prometheus_text(self):
+        """
+        The registry in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"resume_analyzer_{_format_name(name, labels)} {value}")
+            for stage, timer in sorted(self._timers.items()):
+                lines.append(f'resume_analyzer_stage_seconds_count{{stage="{stage}"}} {timer["count"]}')
+                lines.append(f'resume_analyzer_stage_seconds_sum{{stage="{stage}"}} {timer["total"]:.6f}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+def _format_name(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry():
+    return _registry
+
+
+def count(name, value=1, **labels):
+    _registry.count(name, value, **labels)
+
+
+def log_event(event, **fields):
+    if METRICS_LOG:
+        logger.info(json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, default=str))
+
+
+@contextmanager
+def timed(stage, **labels):
+    """
+    Time a block as `stage`: records its duration, counts errors by type and logs one JSON line.
+    """
+    token = _current_stage.set(stage)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = type(e).__name__
+        count("stage_errors", stage=stage, error=error)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _current_stage.reset(token)
+        _registry.observe(stage, elapsed)
+        log_event("stage", stage=stage, elapsed_ms=round(1000 * elapsed, 2), ok=error is None, error=error, **labels)
+
+
+def current_stage():
+    return _current_stage.get()
+
+
+def record_llm_usage(response, stage=None):
+    """
+    Book the prompt and completion tokens of an LLM response to a stage (the current one by default).
+    """
+    usage = getattr(response, "usage_metadata", None) or {}
+    stage = stage or current_stage()
+    count("llm_calls", stage=stage)
+    if usage:
+        count("llm_prompt_tokens", usage.get("input_tokens", 0), stage=stage)
+        count("llm_completion_tokens", usage.get("output_tokens", 0), stage=stage)
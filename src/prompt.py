@@ -12,3 +12,7 @@ system_prompt = (
     "Candidate's profile:"
     "\n{input}"
 )
+
+
+# Bump whenever any analysis prompt changes so cached results are not reused
+PROMPT_VERSION = "4"
@@ -0,0 +1,248 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from src.metrics import timed
+from src.llm_client import LimitedLLM
+
+
+# Shared, process-wide resources (LLM client, embedding model, role indexes).
+# Streamlit re-runs app.py on every interaction, but imported modules stay in
+# sys.modules, so everything created here is built once per process and shared
+# by every session and thread.
+
+load_dotenv()
+
+LLM_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+LLM_TEMPERATURE = float(os.getenv("GEMINI_TEMPERATURE", "0.7"))
+INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "domain-decoders")
+# "pinecone" or "local" (in-process NumPy index built by store_index.py)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+RETRIEVER_K = 5
+# "hybrid" fuses the dense search with the BM25 index built by store_index.py;
+# "dense" uses the vector store alone
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+# Process-wide cap on in-flight Gemini calls, shared by every session and worker
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+_resources = {}
+_timings = {}
+_locks = {}
+_locks_guard = threading.Lock()
+_warmup_thread = None
+_process_start = time.perf_counter()
+
+
+def _lock_for(name):
+    with _locks_guard:
+        if name not in _locks:
+            _locks[name] = threading.Lock()
+        return _locks[name]
+
+
+def _get_or_create(name, factory):
+    # Fast path without locking once the resource exists
+    if name in _resources:
+        return _resources[name]
+
+    # One lock per resource so the embedding model and the LLM client
+    # can be built in parallel, while each is still only built once
+    with _lock_for(name):
+        if name not in _resources:
+            start = time.perf_counter()
+            with timed(f"resource.{name}"):
+                _resources[name] = factory()
+            _timings[name] = time.perf_counter() - start
+    return _resources[name]
+
+
+def override_resource(name, value):
+    """
+    Replace a shared resource ("llm", "embeddings", "vectorstore", "retriever_k5", ...),
+    e.g. with a fake in the offline benchmarks.
+    """
+    with _lock_for(name):
+        _resources[name] = value
+
+
+def _create_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    llm = ChatGoogleGenerativeAI(
+        model=LLM_MODEL,
+        temperature=LLM_TEMPERATURE,
+        google_api_key=os.getenv("GEMINI_API_KEY"),
+        # Retries and backoff are handled by LimitedLLM, with the shared quota in view
+        max_retries=1
+    )
+    return LimitedLLM(llm, LLM_MAX_CONCURRENCY)
+
+
+def _create_vectorstore():
+    if VECTOR_BACKEND == "local":
+        from src.local_index import LocalVectorStore
+
+        return LocalVectorStore(get_embeddings())
+
+    from langchain_pinecone import PineconeVectorStore
+
+    return PineconeVectorStore.from_existing_index(
+        index_name=INDEX_NAME,
+        embedding=get_embeddings()
+    )
+
+
+def get_llm():
+    """
+    Return the shared Gemini chat model.
+    """
+    return _get_or_create("llm", _create_llm)
+
+
+def set_llm_concurrency(limit):
+    """
+    Change the process-wide cap on concurrent Gemini calls (e.g. from the batch CLI).
+    """
+    global LLM_MAX_CONCURRENCY
+    LLM_MAX_CONCURRENCY = limit
+    if "llm" in _resources:
+        _resources["llm"].set_limit(limit)
+
+
+def _create_embeddings():
+    # Imported here so the sentence-transformers stack loads on the warm-up thread, not at import time
+    from src.helper import download_hugging_face_embeddings
+    from src.embedding_cache import CachedEmbeddings
+
+    return CachedEmbeddings(download_hugging_face_embeddings())
+
+
+def get_embeddings():
+    """
+    Return the shared HuggingFace embedding model (all-MiniLM-L6-v2), behind the on-disk embedding cache.
+    """
+    return _get_or_create("embeddings", _create_embeddings)
+
+
+def get_vectorstore():
+    """
+    Return the shared company roles vector store (Pinecone or local, see VECTOR_BACKEND).
+    """
+    return _get_or_create("vectorstore", _create_vectorstore)
+
+
+def _create_lexical_index():
+    from src.lexical_index import LexicalIndex, LEXICAL_INDEX_PATH
+
+    if not os.path.exists(LEXICAL_INDEX_PATH):
+        # Indexed before hybrid search existed; re-run store_index.py to build it
+        return None
+    return LexicalIndex(LEXICAL_INDEX_PATH)
+
+
+def get_lexical_index():
+    """
+    Return the shared BM25 role index, or None when it hasn't been built.
+    """
+    return _get_or_create("lexical_index", _create_lexical_index)
+
+
+def _create_course_store():
+    from src.course_catalogue import COURSE_INDEX_DIR
+    from src.local_index import LocalVectorStore, VECTORS_FILE, current_index_dir
+
+    if not os.path.exists(os.path.join(current_index_dir(COURSE_INDEX_DIR), VECTORS_FILE)):
+        # No course catalogue indexed yet; re-run store_index.py to build it
+        return None
+    return LocalVectorStore(get_embeddings(), COURSE_INDEX_DIR)
+
+
+def get_course_store():
+    """
+    Return the shared course catalogue index (always local), or None when it hasn't been built.
+    """
+    return _get_or_create("course_store", _create_course_store)
+
+
+def _create_retriever(k):
+    lexical_index = get_lexical_index() if RETRIEVAL_MODE == "hybrid" else None
+    if lexical_index is not None:
+        from src.lexical_index import HybridRetriever
+
+        return HybridRetriever(get_vectorstore(), lexical_index, k)
+    return get_vectorstore().as_retriever(search_type="similarity", search_kwargs={"k": k})
+
+
+def get_retriever(k=RETRIEVER_K):
+    """
+    Return a shared retriever over the company roles index returning k results
+    (hybrid dense + BM25 when available, see RETRIEVAL_MODE).
+    """
+    return _get_or_create(f"retriever_k{k}", lambda: _create_retriever(k))
+
+
+def warm_catalogue():
+    """
+    Load the role catalogue indexes used by local extraction and skill-gap ranking.
+    """
+    from src.extractor import skill_vocabulary
+    from src.skill_gap import get_skill_index
+
+    start = time.perf_counter()
+    skill_vocabulary()
+    get_skill_index()
+    _timings.setdefault("catalogue", time.perf_counter() - start)
+
+
+def _warm(getters):
+    for getter in getters:
+        try:
+            getter()
+        except Exception as e:
+            # A failed warm-up is retried lazily on first real use
+            _timings[f"{getter.__name__} (failed)"] = str(e)
+
+
+def _warm_up():
+    # The LLM client and the catalogue don't depend on the embedding model, so
+    # they load side by side with the embeddings -> vector store -> retriever chain
+    side = threading.Thread(target=_warm, args=((get_llm, warm_catalogue),), name="resource-warm-up-side", daemon=True)
+    side.start()
+    _warm((get_embeddings, get_vectorstore, get_lexical_index, get_retriever, get_course_store))
+    side.join()
+    _timings["warm_up_total"] = time.perf_counter() - _process_start
+
+
+def record_startup(name, seconds):
+    """
+    Add a startup measurement (e.g. app import time) to the startup report; the first value is kept.
+    """
+    _timings.setdefault(name, seconds)
+
+
+def warm_up(background=True):
+    """
+    Start building all shared resources. Safe to call on every rerun:
+    only the first call starts the warm-up thread.
+    """
+    global _warmup_thread
+    with _locks_guard:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_warm_up, name="resource-warm-up", daemon=True)
+            _warmup_thread.start()
+    if not background:
+        _warmup_thread.join()
+    return _warmup_thread
+
+
+def is_warm():
+    return _warmup_thread is not None and not _warmup_thread.is_alive()
+
+
+def startup_report():
+    """
+    Seconds spent creating each shared resource, plus whether warm-up finished.
+    """
+    report = {name: (round(value, 3) if isinstance(value, float) else value) for name, value in _timings.items()}
+    report["warm"] = is_warm()
+    return report
@@ -0,0 +1,213 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from src.analysis import analyze_resume_text, generate_todo_list_for_role, todo_cache_key
+from src.cache import get_cache, sha256_bytes
+from src.ingest import ingest_pdf
+from src.metrics import count
+from src.upload_store import get_upload_store
+
+
+# Service layer behind the HTTP API (server.py): resumes are submitted as jobs,
+# analysed on a bounded worker pool and tracked in a local SQLite job store, so
+# any client (the Streamlit UI, the ATS integration) can submit and poll.
+
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "4"))
+# Jobs waiting or running beyond this are rejected instead of queueing without bound
+SERVICE_MAX_QUEUE = int(os.getenv("SERVICE_MAX_QUEUE", "64"))
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", ".cache/jobs.sqlite3")
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL", str(7 * 24 * 3600)))
+# Finished jobs kept beyond this are dropped oldest first, whatever their age
+JOB_MAX_FINISHED = int(os.getenv("JOB_MAX_FINISHED", "10000"))
+# How often wait() re-reads a job that another server process is running
+JOB_POLL_SECONDS = 0.5
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobStore:
+    def __init__(self, path=JOB_STORE_PATH, ttl=JOB_TTL_SECONDS, max_finished=JOB_MAX_FINISHED):
+        self.ttl = ttl
+        self.max_finished = max_finished
+        # Several server processes may share the store; each job records the one running it
+        self.host = socket.gethostname()
+        self.owner = f"{self.host}:{os.getpid()}"
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, pdf_hash TEXT NOT NULL, filename TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, result TEXT, error TEXT, owner TEXT)"
+        )
+        if "owner" not in [column[1] for column in self._conn.execute("PRAGMA table_info(jobs)")]:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        self._recover(time.time())
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_updated_at ON jobs (updated_at)")
+        self._evict(time.time())
+        self._conn.commit()
+
+    def create(self, job_id, pdf_hash, filename):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, pdf_hash, filename, created_at, updated_at, owner) VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, pdf_hash, filename, now, now, self.owner)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def update(self, job_id, status, result=None, error=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def _recover(self, now):
+        # Jobs whose process stopped while they were queued or running will never
+        # finish. Only this host's dead processes can be told apart from live
+        # siblings; jobs from before owners were recorded count as dead
+        stale = []
+        for job_id, owner in self._conn.execute("SELECT id, owner FROM jobs WHERE status IN ('queued', 'running')").fetchall():
+            host, _, pid = (owner or "").rpartition(":")
+            if owner is None or (host == self.host and pid.isdigit() and not _process_alive(int(pid))):
+                stale.append((now, job_id))
+        self._conn.executemany(
+            "UPDATE jobs SET status = 'failed', error = 'interrupted by a restart', updated_at = ? WHERE id = ?", stale
+        )
+
+    def _evict(self, now):
+        # Called with the lock held (or from __init__); queued and running jobs are never dropped
+        finished = "status NOT IN ('queued', 'running')"
+        self._conn.execute(f"DELETE FROM jobs WHERE {finished} AND updated_at < ?", (now - self.ttl,))
+        self._conn.execute(
+            f"DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE {finished} ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_finished,)
+        )
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, pdf_hash, filename, created_at, updated_at, result, error FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "pdf_hash": row[2],
+            "filename": row[3],
+            "created_at": row[4],
+            "updated_at": row[5],
+            "result": json.loads(row[6]) if row[6] else None,
+            "error": row[7],
+        }
+
+
+class AnalysisService:
+    def __init__(self, cache=None, store=None, max_workers=SERVICE_WORKERS, max_queue=SERVICE_MAX_QUEUE):
+        self.cache = cache or get_cache()
+        self.store = store or JobStore()
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def submit(self, pdf_bytes, filename="", include_todos=True):
+        """
+        Queue a resume for analysis and return its job. Raises QueueFull when the pool is saturated.
+        """
+        with self._lock:
+            if len(self._pending) >= self.max_queue:
+                count("service_jobs", status="rejected")
+                raise QueueFull(f"{len(self._pending)} jobs already queued or running")
+            job_id = uuid.uuid4().hex
+            self._pending[job_id] = threading.Event()
+        pdf_hash = sha256_bytes(pdf_bytes)
+        self.store.create(job_id, pdf_hash, filename)
+        count("service_jobs", status="queued")
+        self._executor.submit(self._run, job_id, pdf_bytes, pdf_hash, filename, include_todos)
+        return self.store.get(job_id)
+
+    def _run(self, job_id, pdf_bytes, pdf_hash, filename, include_todos):
+        self.store.update(job_id, "running")
+        try:
+            parsed = ingest_pdf(pdf_bytes)
+            get_upload_store().put(pdf_bytes, filename, parsed.page_count, pdf_hash)
+            result = analyze_resume_text(parsed.text, pdf_hash, self.cache, include_todos)
+            result["pages"] = parsed.page_count
+            self.store.update(job_id, "done", result=result)
+            count("service_jobs", status="done")
+        except Exception as e:
+            self.store.update(job_id, "failed", error=str(e))
+            count("service_jobs", status="failed")
+        finally:
+            with self._lock:
+                done = self._pending.pop(job_id, None)
+            if done is not None:
+                done.set()
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def wait(self, job_id, timeout):
+        """
+        Block up to timeout seconds for the job to finish, then return its current state.
+        """
+        with self._lock:
+            done = self._pending.get(job_id)
+        if done is not None:
+            done.wait(timeout)
+            return self.store.get(job_id)
+
+        # Run by another server process on the same store: poll it
+        deadline = time.monotonic() + timeout
+        job = self.store.get(job_id)
+        while job is not None and job["status"] in ("queued", "running") and time.monotonic() < deadline:
+            time.sleep(min(JOB_POLL_SECONDS, max(deadline - time.monotonic(), 0)))
+            job = self.store.get(job_id)
+        return job
+
+    def todo(self, user_skills, role):
+        """
+        One role's to-do list, memoized like in the UI.
+        """
+        return self.cache.get_or_compute(todo_cache_key(user_skills, role), lambda: generate_todo_list_for_role(user_skills, role))
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """
+    Return the process-wide AnalysisService.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = AnalysisService()
+    return _service
@@ -0,0 +1,62 @@
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+# Minimal client for the analysis service (server.py), used by the Streamlit UI
+# when ANALYSIS_SERVICE_URL is set. Standard library only.
+
+
+class ServiceError(Exception):
+    pass
+
+
+class ServiceClient:
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method, path, body=None, content_type=None):
+        request = urllib.request.Request(f"{self.base_url}{path}", data=body, method=method)
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode("utf-8")).get("error", str(e))
+            except Exception:
+                message = str(e)
+            raise ServiceError(message) from e
+        except urllib.error.URLError as e:
+            raise ServiceError(f"analysis service unreachable: {e.reason}") from e
+
+    def submit(self, pdf_bytes, filename="", include_todos=False, wait=0):
+        query = urllib.parse.urlencode({"filename": filename, "todos": int(include_todos), "wait": wait})
+        return self._request("POST", f"/analyze?{query}", pdf_bytes, "application/pdf")
+
+    def job(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def analyze(self, pdf_bytes, filename="", include_todos=False, timeout=300, poll_interval=0.5):
+        """
+        Submit a resume and poll until it is analysed; returns the analysis result.
+        """
+        # The first wait covers most analyses, so polling is rarely needed
+        job = self.submit(pdf_bytes, filename, include_todos, wait=min(self.timeout - 5, timeout))
+        deadline = time.monotonic() + timeout
+        while job["status"] in ("queued", "running"):
+            if time.monotonic() > deadline:
+                raise ServiceError(f"analysis did not finish within {timeout}s")
+            time.sleep(poll_interval)
+            job = self.job(job["job_id"])
+        if job["status"] != "done":
+            raise ServiceError(job.get("error") or "analysis failed")
+        return job["result"]
+
+    def todo(self, user_skills, role):
+        body = json.dumps({"skills": user_skills, "role": role}).encode("utf-8")
+        return self._request("POST", "/todo", body, "application/json")["todo"]
@@ -0,0 +1,107 @@
+import os
+from functools import lru_cache
+import numpy as np
+from src.helper import ROLES_PATH, load_role_skills
+
+
+# Skill-gap recommendations computed from the role catalogue, without the LLM.
+# The index is a binary role x skill matrix plus what is derived from it once:
+# a skill -> roles inverted index, skill co-occurrence counts and skill frequency.
+# Ranking a candidate is a handful of small matrix products.
+
+# Weights of the three signals in a missing skill's score
+NEIGHBOUR_WEIGHT = float(os.getenv("SKILL_GAP_NEIGHBOUR_WEIGHT", "0.6"))
+COOCCURRENCE_WEIGHT = float(os.getenv("SKILL_GAP_COOCCURRENCE_WEIGHT", "0.3"))
+FREQUENCY_WEIGHT = float(os.getenv("SKILL_GAP_FREQUENCY_WEIGHT", "0.1"))
+
+
+class SkillIndex:
+    def __init__(self, role_skills):
+        """
+        role_skills: one list of skill names per role.
+        """
+        self.skills = []
+        self.positions = {}
+        for skills in role_skills:
+            for skill in skills:
+                if skill.lower() not in self.positions:
+                    self.positions[skill.lower()] = len(self.skills)
+                    self.skills.append(skill)
+
+        self.matrix = np.zeros((len(role_skills), len(self.skills)), dtype=np.float32)
+        for row, skills in enumerate(role_skills):
+            for skill in skills:
+                self.matrix[row, self.positions[skill.lower()]] = 1.0
+
+        # skill position -> row numbers of the roles that ask for it
+        self.roles_by_skill = {position: np.flatnonzero(self.matrix[:, position]) for position in range(len(self.skills))}
+        self.cooccurrence = self.matrix.T @ self.matrix
+        np.fill_diagonal(self.cooccurrence, 0)
+        self.frequency = self.matrix.sum(axis=0)
+        self.role_sizes = self.matrix.sum(axis=1)
+
+    def vector(self, skills):
+        vector = np.zeros(len(self.skills), dtype=np.float32)
+        for skill in skills:
+            position = self.positions.get(str(skill).strip().lower())
+            if position is not None:
+                vector[position] = 1.0
+        return vector
+
+    def candidate_roles(self, skills):
+        """
+        Row numbers of the roles that share at least one skill with the candidate.
+        """
+        rows = [self.roles_by_skill[position] for position in np.flatnonzero(self.vector(skills))]
+        return np.unique(np.concatenate(rows)) if rows else np.zeros(0, dtype=np.int64)
+
+    def closest_roles(self, skills):
+        """
+        (row numbers, cosine similarity) of the roles sharing a skill with the
+        candidate; every other role has a similarity of 0.
+        """
+        user = self.vector(skills)
+        rows = self.candidate_roles(skills)
+        overlap = self.matrix[rows] @ user
+        return rows, overlap / np.sqrt(np.maximum(self.role_sizes[rows], 1) * max(user.sum(), 1))
+
+    def recommend(self, skills, top_n=18):
+        """
+        Missing skills ranked by how much the closest roles, the candidate's
+        current skills (co-occurrence) and the catalogue as a whole ask for them.
+        """
+        if not self.skills:
+            return []
+        user = self.vector(skills)
+        rows, similarity = self.closest_roles(skills)
+        # Only the roles sharing a skill contribute; with no overlap at all,
+        # every role counts the same, which is the skill frequency
+        neighbours = similarity @ self.matrix[rows] if len(rows) else self.frequency
+
+        scores = NEIGHBOUR_WEIGHT * _scale(neighbours)
+        scores += COOCCURRENCE_WEIGHT * _scale(self.cooccurrence @ user)
+        scores += FREQUENCY_WEIGHT * _scale(self.frequency)
+        scores[user > 0] = -1.0
+
+        # Ties are broken by name so results are deterministic
+        order = sorted(np.flatnonzero(scores > 0), key=lambda position: (-round(float(scores[position]), 6), self.skills[position].lower()))
+        return [self.skills[position] for position in order[:top_n]]
+
+
+def _scale(values):
+    peak = values.max() if values.size else 0
+    return values / peak if peak > 0 else values
+
+
+@lru_cache(maxsize=1)
+def get_skill_index(roles_path=ROLES_PATH):
+    """
+    Build the skill index once per process from the role spreadsheet.
+    """
+    try:
+        # The same read that built the extractor's skill vocabulary
+        role_skills = load_role_skills(roles_path)
+    except (FileNotFoundError, KeyError, ValueError):
+        # No usable catalogue: an empty index recommends nothing instead of failing every analysis
+        role_skills = []
+    return SkillIndex(role_skills)
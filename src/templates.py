@@ -0,0 +1,398 @@
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from string import Template
+
+
+# HTML fragments for the analysis report.
+# Templates are compiled once at import; every field is HTML-escaped (the values
+# come from the resume and from Gemini) and URLs must be http(s). Rendered
+# fragments are memoized by a hash of their input, so a rerun with unchanged
+# data reuses the same string instead of rebuilding it. st.markdown parses them
+# as Markdown, where a blank line ends an HTML block and turns the indented rest
+# into a code block, so rendered fragments never contain blank lines.
+
+FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", "2048"))
+
+_fragments = OrderedDict()
+_fragments_lock = threading.Lock()
+
+
+def _memoized(name, data, build):
+    key = hashlib.sha256(json.dumps([name, data], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    with _fragments_lock:
+        if key in _fragments:
+            _fragments.move_to_end(key)
+            return _fragments[key]
+    # Empty optional sections and multi-paragraph values must not leave blank lines
+    fragment = "\n".join(line for line in build().splitlines() if line.strip())
+    with _fragments_lock:
+        _fragments[key] = fragment
+        while len(_fragments) > FRAGMENT_CACHE_SIZE:
+            _fragments.popitem(last=False)
+    return fragment
+
+
+def escape(value):
+    return html.escape(str(value if value is not None else ""), quote=True)
+
+
+def safe_url(url):
+    # Anything but a plain http(s) link (javascript:, data:, ...) becomes a dead link
+    url = str(url or "").strip()
+    return escape(url) if re.match(r"^https?://", url, re.IGNORECASE) else "#"
+
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", css).strip()
+
+
+# Page stylesheet. Streamlit only keeps what a rerun emits, so it is sent on every
+# rerun; it is minified once here so each rerun sends the same small string.
+FONT_LINK = '<link href="https://fonts.googleapis.com/css2?family=Poppins:wght@400;600;700&display=swap" rel="stylesheet">'
+_PAGE_STYLE = """
+html, body, .main {
+    height: 100%;
+    min-height: 100vh;
+    font-family: 'Poppins', sans-serif !important;
+    background: linear-gradient(135deg, #f8cdda 0%, #1fa2ff 100%, #a1c4fd 100%);
+    background-attachment: fixed;
+}
+.main {
+    background: none !important;
+    padding: 1rem;
+}
+h1, h2, h3, h4, h5, h6 {
+    font-family: 'Poppins', sans-serif !important;
+    font-weight: 700;
+    letter-spacing: 0.5px;
+}
+h1 {
+    font-size: clamp(1.8rem, 4vw, 2.8rem);
+    color: #22223b;
+    margin-bottom: 1.5rem;
+}
+h2 {
+    font-size: clamp(1.6rem, 3vw, 2.2rem);
+    color: #22223b;
+}
+h3 {
+    font-size: clamp(1.4rem, 2.5vw, 1.6rem);
+    color: #22223b;
+}
+.card {
+    border-radius: 24px;
+    padding: clamp(1.5rem, 3vw, 2.5rem) clamp(1rem, 2vw, 2rem);
+    background: rgba(255, 255, 255, 0.25);
+    box-shadow: 0 8px 32px 0 rgba(31, 38, 135, 0.18);
+    backdrop-filter: blur(12px);
+    -webkit-backdrop-filter: blur(12px);
+    border: 1.5px solid rgba(255, 255, 255, 0.35);
+    margin: clamp(1rem, 2vw, 2rem) 0;
+    transition: box-shadow 0.3s, transform 0.3s;
+    width: 100%;
+    max-width: 1200px;
+    margin-left: auto;
+    margin-right: auto;
+}
+.card:hover {
+    box-shadow: 0 12px 40px 0 rgba(31, 38, 135, 0.25);
+    transform: translateY(-4px) scale(1.01);
+}
+.skill-chip {
+    display: inline-block;
+    background: rgba(255,255,255,0.45);
+    padding: clamp(0.8rem, 1.5vw, 1.4rem) clamp(1.4rem, 2.8vw, 2.8rem);
+    border-radius: 30px;
+    margin: 0.5rem;
+    color: #22223b;
+    font-weight: 600;
+    font-size: clamp(0.9rem, 1.5vw, 1.1rem);
+    box-shadow: 0 2px 8px rgba(31, 38, 135, 0.08);
+    border: 1px solid rgba(255,255,255,0.3);
+}
+.course-card {
+    background: rgba(255,255,255,0.30);
+    border-radius: 20px;
+    padding: clamp(1rem, 2vw, 2rem) clamp(0.8rem, 1.5vw, 1.5rem);
+    margin: clamp(1rem, 2vw, 2rem) 0;
+    box-shadow: 0 6px 24px 0 rgba(31, 38, 135, 0.13);
+    transition: box-shadow 0.3s, transform 0.3s;
+    display: flex;
+    flex-direction: column;
+    gap: 1rem;
+    align-items: flex-start;
+    border: 1.5px solid rgba(255,255,255,0.25);
+    backdrop-filter: blur(10px);
+    width: 100%;
+}
+@media (min-width: 768px) {
+    .course-card {
+        flex-direction: row;
+        align-items: center;
+    }
+}
+.course-card:hover {
+    box-shadow: 0 12px 40px 0 rgba(31, 38, 135, 0.22);
+    transform: translateY(-4px) scale(1.01);
+}
+.edu-proj-item {
+    display: flex;
+    align-items: flex-start;
+    background: rgba(255,255,255,0.35);
+    border-radius: 16px;
+    margin: 1.2rem 0;
+    padding: 1.2rem 1.5rem;
+    box-shadow: 0 4px 18px 0 rgba(31, 38, 135, 0.10);
+    border-left: 8px solid;
+    border-image: linear-gradient(135deg, #f8cdda 0%, #1fa2ff 100%, #a1c4fd 100%) 1;
+    transition: box-shadow 0.3s, transform 0.3s;
+    width: 100%;
+}
+.edu-proj-title {
+    font-size: clamp(1rem, 1.5vw, 1.22rem);
+    font-weight: 700;
+    color: #22223b;
+    margin-bottom: 0.3rem;
+    letter-spacing: 0.2px;
+}
+.edu-proj-detail {
+    font-size: clamp(0.9rem, 1.2vw, 1.08rem);
+    color: #4a6fa5;
+    font-weight: 500;
+    margin-left: 0.1rem;
+}
+.personal-info h4 {
+    font-size: clamp(1.2rem, 1.8vw, 1.5rem);
+    margin: 1.2rem 0;
+    color: #22223b;
+}
+.personal-info p {
+    color: #4a6fa5;
+    margin: 0.5rem 0;
+    font-size: clamp(0.9rem, 1.2vw, 1.1rem);
+}
+.details-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+    gap: 1.5rem;
+    margin: 1.5rem 0;
+    width: 100%;
+}
+.details-section {
+    text-align: center;
+    padding: 1rem;
+}
+.education-list, .project-list {
+    text-align: left;
+    margin: 0 auto;
+    width: 100%;
+}
+.stButton>button {
+    background: linear-gradient(90deg, #a1c4fd 0%, #c2e9fb 100%);
+    color: #22223b;
+    border-radius: 10px;
+    padding: clamp(0.8rem, 1.5vw, 1rem) clamp(1.4rem, 2.8vw, 2.8rem);
+    font-weight: 600;
+    font-size: clamp(0.9rem, 1.2vw, 1.1rem);
+    border: none;
+    box-shadow: 0 2px 8px rgba(31, 38, 135, 0.08);
+    transition: background 0.3s, color 0.3s, box-shadow 0.3s;
+    width: 100%;
+    max-width: 300px;
+    margin: 0 auto;
+}
+.stButton>button:hover {
+    background: linear-gradient(90deg, #f8cdda 0%, #a1c4fd 100%);
+    color: #22223b;
+    box-shadow: 0 4px 16px rgba(31, 38, 135, 0.13);
+}
+.sidebar .sidebar-content {
+    background: rgba(255,255,255,0.10);
+}
+/* Custom scrollbar */
+::-webkit-scrollbar {
+    width: 10px;
+    background: rgba(161,196,253,0.15);
+}
+::-webkit-scrollbar-thumb {
+    background: rgba(31,38,135,0.13);
+    border-radius: 8px;
+}
+/* Responsive images */
+img {
+    max-width: 100%;
+    height: auto;
+}
+/* Responsive columns */
+@media (max-width: 768px) {
+    .stColumns {
+        flex-direction: column;
+    }
+    .stColumn {
+        width: 100% !important;
+        margin: 1rem 0;
+    }
+}
+/* File uploader styling */
+.stFileUploader {
+    width: 100%;
+    max-width: 600px;
+    margin: 0 auto;
+}
+/* Container padding */
+.stContainer {
+    padding: 1rem;
+}
+/* Responsive text */
+p, span, div {
+    font-size: clamp(0.9rem, 1.2vw, 1.1rem);
+}
+"""
+PAGE_CSS = f"{FONT_LINK}<style>{minify_css(_PAGE_STYLE)}</style>"
+
+
+_DETAILS_SECTION = Template(
+    '<div class="details-section" style="grid-column: 1 / -1; margin-bottom: 2.5rem;">'
+    '<h4 style="color: #1e3d59; font-size: 1.25rem; font-weight: 600; margin-bottom: 1.2rem; text-align:left;">$heading</h4>'
+    '<div class="$list_class">$entries</div></div>'
+)
+_DETAILS_ENTRY = Template(
+    '<div style="background: #f8f9fa; border-radius: 12px; box-shadow: 0 2px 8px rgba(31,38,135,0.07); padding: 1.1rem 1.5rem; margin-bottom: 1.1rem; border-left: 5px solid $accent;">'
+    '<span style="font-size: 1.08rem; font-weight: 600; color: #22223b;">$title</span>'
+    '<br><span style="font-size: 1.02rem; color: #4a6fa5; font-weight: 500;">$subtitle</span>'
+    '</div>'
+)
+_OVERVIEW = Template('''
+<div class="card" style="max-width: 1200px; margin: 0 auto;">
+    <h3 style="text-align:center;">Personal Overview</h3>
+    <div class="personal-info">
+        <h4 style="text-align:center;">$name</h4>
+        <div class="details-grid">
+            <div class="details-section"><p>📧 Email</p><h4>$email</h4></div>
+            <div class="details-section"><p>📱 Contact</p><h4>$phone</h4></div>
+            <div class="details-section"><p>📅 Experience Level</p><h4>$experience_level</h4></div>
+            <div class="details-section"><p>💼 Target Job Role</p><h4>$target_role</h4></div>
+            $education
+            $projects
+        </div>
+    </div>
+</div>
+''')
+_SKILL_CHIPS = Template('''
+<div class="card" style="max-width: 1200px; margin: 0 auto; padding: 1.5rem 2rem;">
+    <div style="display: flex; flex-wrap: wrap; gap: 1rem; justify-content: center;">$chips</div>
+</div>
+''')
+_RECOMMENDED_SKILL = Template(
+    '<div style="flex: 1 1 180px; min-width: 140px; background: #f8f9fa; border-radius: 10px; padding: 1rem 1.5rem; margin: 0.5rem 0; display: flex; align-items: center; gap: 1rem;">'
+    '<div style="width: 8px; height: 40px; background: #1e3d59; border-radius: 4px;"></div>'
+    '<span style="font-size: 1.1rem; color: #2a4b6e;">$skill</span>'
+    '</div>'
+)
+_COURSE_CARD = Template('''
+<div class="course-card" style="width: 100%; max-width: 95%; margin: 2rem auto; display: flex; align-items: center; background: white; box-shadow: 0 4px 20px rgba(30, 61, 89, 0.1); border-radius: 12px; padding: 1.5rem;">
+    <img src="$thumbnail" style="width: 120px; height: 80px; border-radius: 8px; object-fit: cover; margin-right: 2rem;">
+    <div style="flex: 1;">
+        <a href="$url" target="_blank" rel="noopener" style="font-size: 1.1rem; font-weight: 600; color: #1e3d59; text-decoration: none;">$title</a>
+        <p style="margin: 12px 0; color: #4a6fa5; font-size: 1rem; line-height: 1.4;">$description</p>$reason
+        <div style="display: flex; gap: 1rem; align-items: center;">
+            <span style="background: #e8eef4; padding: 6px 16px; border-radius: 20px; font-size: 0.95rem; color: #1e3d59;">$category</span>
+            <a href="$url" target="_blank" rel="noopener" style="color: #1e3d59; text-decoration: none; font-weight: 500;">View Course →</a>
+        </div>
+    </div>
+</div>
+''')
+_ROLE_BADGE = '<span style="background: #e8eef4; padding: 6px 16px; border-radius: 20px; font-size: 0.95rem; color: #1e3d59;">$value</span>'
+_ROLE_CARD = Template('''
+<div class="course-card" style="width: 100%; max-width: 95%; margin: 2rem auto; display: flex; align-items: center; background: white; box-shadow: 0 4px 20px rgba(30, 61, 89, 0.1); border-radius: 12px; padding: 1.5rem;">
+    <div style="flex: 1;">
+        <h4 style="font-size: 1.3rem; font-weight: 600; color: #1e3d59; margin-bottom: 0.5rem;">$role at $company</h4>
+        <div style="display: flex; gap: 1rem; margin-bottom: 1rem;">
+            ''' + _ROLE_BADGE.replace("$value", "$level") + '''
+            ''' + _ROLE_BADGE.replace("$value", "$experience") + '''
+            ''' + _ROLE_BADGE.replace("$value", "$package") + '''
+        </div>
+        <p style="color: #4a6fa5; font-size: 1rem; line-height: 1.4;">
+            <b>Responsibilities:</b> $responsibilities<br>
+            <b>Language:</b> $language<br>
+            <b>Essential Knowledge:</b> $knowledge
+        </p>
+    </div>
+</div>
+''')
+
+
+def _details_section(heading, list_class, accent, entries):
+    if not entries:
+        return ""
+    rendered = "".join(
+        _DETAILS_ENTRY.substitute(
+            accent=accent,
+            # "Title | subtitle" entries are shown on two lines
+            title=escape(str(entry).split("|", 1)[0]),
+            subtitle=escape(str(entry).split("|", 1)[1]) if "|" in str(entry) else "",
+        )
+        for entry in entries
+    )
+    return _DETAILS_SECTION.substitute(heading=heading, list_class=list_class, entries=rendered)
+
+
+def overview_html(resume_data, target_role=None):
+    """
+    The personal overview card with education and projects.
+    """
+    def build():
+        return _OVERVIEW.substitute(
+            name=escape(resume_data.get("name") or "Not found"),
+            email=escape(resume_data.get("email") or "Not provided"),
+            phone=escape(resume_data.get("phone") or "Not provided"),
+            experience_level=escape(resume_data.get("experience_level") or "Fresher"),
+            target_role=escape(f"{target_role['role']} at {target_role['company']}") if target_role else "Not found",
+            education=_details_section("🎓 Education", "education-list", "#a1c4fd", resume_data.get("education")),
+            projects=_details_section("🔧 Key Projects", "project-list", "#f8cdda", resume_data.get("projects")),
+        )
+    return _memoized("overview", [resume_data, target_role], build)
+
+
+def skill_chips_html(skills):
+    return _memoized("skill_chips", skills, lambda: _SKILL_CHIPS.substitute(
+        chips="".join(f'<span class="skill-chip">{escape(skill)}</span>' for skill in skills)
+    ))
+
+
+def recommended_skills_html(recommended_skills):
+    return _memoized("recommended_skills", recommended_skills, lambda: (
+        '<div class="card" style="max-width: 95%; margin: 0 auto; display: flex; flex-wrap: wrap; gap: 1.5rem; justify-content: center;">'
+        + "".join(_RECOMMENDED_SKILL.substitute(skill=escape(skill)) for skill in recommended_skills)
+        + '</div>'
+    ))
+
+
+def course_card_html(course):
+    return _memoized("course_card", course, lambda: _COURSE_CARD.substitute(
+        thumbnail=safe_url(course.get("thumbnail")),
+        url=safe_url(course.get("url")),
+        title=escape(course.get("title")),
+        description=escape(course.get("description")),
+        category=escape(course.get("category")),
+        # Set when Gemini reranked the catalogue shortlist
+        reason=f'<p style="margin: 0 0 12px; color: #1e3d59; font-size: 0.95rem;"><b>Why:</b> {escape(course["reason"])}</p>' if course.get("reason") else "",
+    ))
+
+
+def course_cards_html(courses):
+    return "".join(course_card_html(course) for course in courses)
+
+
+def role_card_html(role):
+    fields = ("role", "company", "level", "experience", "package", "responsibilities", "language", "knowledge")
+    return _memoized("role_card", role, lambda: _ROLE_CARD.substitute(
+        {field: escape(role.get(field)) for field in fields}
+    ))
@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import threading
+import time
+from src.cache import sha256_bytes
+
+
+# Content-addressed store for uploaded resumes.
+# Files are named by the SHA-256 of their bytes (the same hash the analysis
+# caches are keyed on), so identical uploads are written once and different
+# files with the same name never collide. A small SQLite index keeps each
+# file's original name, size, page count and upload times, and is used to evict
+# files past the age limit and, oldest first, beyond the size budget.
+
+UPLOAD_STORE_DIR = os.getenv("UPLOAD_STORE_DIR", "Uploaded_Resumes/store")
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(500 * 1024 * 1024)))
+UPLOAD_MAX_AGE_SECONDS = int(os.getenv("UPLOAD_MAX_AGE", str(90 * 24 * 3600)))
+INDEX_FILE = "index.sqlite3"
+
+
+class UploadStore:
+    def __init__(self, root=UPLOAD_STORE_DIR, max_bytes=UPLOAD_MAX_BYTES, max_age=UPLOAD_MAX_AGE_SECONDS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, INDEX_FILE), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS uploads ("
+            "sha256 TEXT PRIMARY KEY, filename TEXT, size INTEGER NOT NULL, pages INTEGER, "
+            "uploaded_at REAL NOT NULL, last_seen_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def path(self, digest):
+        # Two-character fan-out keeps directories small
+        return os.path.join(self.root, digest[:2], f"{digest}.pdf")
+
+    def put(self, data, filename="", page_count=None, digest=None):
+        """
+        Store an upload unless identical bytes are already stored; returns its SHA-256.
+        """
+        digest = digest or sha256_bytes(data)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM uploads WHERE sha256 = ?", (digest,)).fetchone()
+            if row is not None and os.path.exists(self.path(digest)):
+                # Same bytes again: no write, just refresh the index entry
+                self._conn.execute(
+                    "UPDATE uploads SET filename = ?, pages = COALESCE(?, pages), last_seen_at = ? WHERE sha256 = ?",
+                    (filename, page_count, now, digest)
+                )
+                self._conn.commit()
+                return digest
+
+            path = self.path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads (sha256, filename, size, pages, uploaded_at, last_seen_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, filename, len(data), page_count, now, now)
+            )
+            self._conn.commit()
+            self._evict(now, keep=digest)
+        return digest
+
+    def get(self, digest):
+        """
+        The stored bytes, or None.
+        """
+        try:
+            with open(self.path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def info(self, digest):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, filename, size, pages, uploaded_at, last_seen_at FROM uploads WHERE sha256 = ?", (digest,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("sha256", "filename", "size", "pages", "uploaded_at", "last_seen_at"), row))
+
+    def _remove(self, digests):
+        for digest in digests:
+            try:
+                os.remove(self.path(digest))
+            except FileNotFoundError:
+                pass
+        self._conn.executemany("DELETE FROM uploads WHERE sha256 = ?", [(digest,) for digest in digests])
+
+    def _evict(self, now, keep=None):
+        # Called with the lock held
+        expired = [row[0] for row in self._conn.execute(
+            "SELECT sha256 FROM uploads WHERE last_seen_at < ? AND sha256 != ?", (now - self.max_age, keep or "")
+        )]
+        self._remove(expired)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM uploads").fetchone()[0]
+        if total > self.max_bytes:
+            evicted = []
+            for digest, size in self._conn.execute(
+                "SELECT sha256, size FROM uploads WHERE sha256 != ? ORDER BY last_seen_at", (keep or "",)
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                evicted.append(digest)
+                total -= size
+            self._remove(evicted)
+        self._conn.commit()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_upload_store():
+    """
+    Return the process-wide UploadStore.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = UploadStore()
+    return _store
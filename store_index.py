@@ -1,41 +1,62 @@
-from src.helper import text_split, download_hugging_face_embeddings, load_excel_file
+from src.helper import download_hugging_face_embeddings, load_excel_file
+from src.embedding_cache import CachedEmbeddings
+from src.indexer import sync_index, PineconeTarget, LocalTarget
+from src.lexical_index import write_lexical_index
+from src.course_catalogue import load_course_file, COURSES_PATH, COURSE_INDEX_DIR
+from src.resources import INDEX_NAME
 # from pinecone.grpc import PineconeGRPC as Pinecone
 from pinecone import Pinecone, ServerlessSpec
 # from pinecone import ServerlessSpec
-from langchain_pinecone import PineconeVectorStore
 from dotenv import load_dotenv
-import pandas as pd
+import argparse
 import os
 
 load_dotenv()
 
-PINECONE_API_KEY = os.environ.get('PINECONE_API_KEY')
-os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
+# "pinecone" uploads to the Pinecone index, "local" writes the in-process NumPy index
+VECTOR_BACKEND = os.environ.get("VECTOR_BACKEND", "pinecone")
+
+parser = argparse.ArgumentParser(description="Incrementally index Data/company roles.xlsx and the course catalogue")
+parser.add_argument("--rebuild", action="store_true", help="drop all vectors and re-embed every row")
+args = parser.parse_args()
 
 # Load and process Excel data
-excel_data = load_excel_file('Data/company roles.xlsx')  # Returns list of Document objects
-text_chunks = text_split(excel_data)
-print(text_chunks)
-print("Hi ")
-embeddings = download_hugging_face_embeddings()
-
-pc = Pinecone(api_key=PINECONE_API_KEY)
-
-index_name = "domain-decoders-test"
-if not index_name in pc.list_indexes():
-  pc.create_index(
-      name=index_name,
-      dimension=384, 
-      metric="cosine", 
-      spec=ServerlessSpec(
-          cloud="aws", 
-          region="us-east-1"
+# One Document per role, every column in its metadata; not chunked
+role_docs = load_excel_file('Data/company roles.xlsx')
+# Unchanged rows are never embedded twice, even after --rebuild
+embeddings = CachedEmbeddings(download_hugging_face_embeddings())
+
+if VECTOR_BACKEND == "local":
+    target = LocalTarget()
+else:
+    PINECONE_API_KEY = os.environ.get('PINECONE_API_KEY')
+    os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
+
+    pc = Pinecone(api_key=PINECONE_API_KEY)
+
+    # The same PINECONE_INDEX_NAME the app queries, so the manifest describes that index
+    index_name = INDEX_NAME
+    # list_indexes() returns index descriptions, compare against their names
+    if index_name not in pc.list_indexes().names():
+      pc.create_index(
+          name=index_name,
+          dimension=384, 
+          metric="cosine", 
+          spec=ServerlessSpec(
+              cloud="aws", 
+              region="us-east-1"
+          ) 
       ) 
-  ) 
-
-# Embed each chunk and upsert the embeddings into your Pinecone index
-docsearch = PineconeVectorStore.from_documents(
-    documents=text_chunks,
-    index_name=index_name,
-    embedding=embeddings, 
-)
+    target = PineconeTarget(pc.Index(index_name), index_name)
+
+# Only new or changed rows are embedded and upserted; removed rows are deleted
+summary = sync_index(role_docs, embeddings, target, rebuild=args.rebuild)
+print(summary)
+
+# The keyword index is cheap to build, so it is always rebuilt from every row
+print(f"Lexical index: {write_lexical_index(role_docs)} roles")
+
+# The course catalogue is small, so it always gets a local index, whichever backend holds the roles
+if os.path.exists(COURSES_PATH):
+    course_summary = sync_index(load_course_file(COURSES_PATH), embeddings, LocalTarget(COURSE_INDEX_DIR), rebuild=args.rebuild)
+    print(f"Courses: {course_summary}")